@@ -15,8 +15,10 @@ os.makedirs(TRANSLATED_DIR, exist_ok=True)
 @st.cache_resource
 def load_reader(language='vi'):
     """
-    Load Manga Reader model once and cache it.
-    This prevents reloading the heavy models on each interaction.
+    Load a Manga Reader per target language and cache it.
+    The OCR and detection models are shared by the readers of every
+    language (loaded once per process), so a language only adds its
+    translator and HTTP session.
     """
     try:
         logger.info(f"Loading Manga Reader model for language: {language}...")
@@ -165,3 +167,8 @@ def app():
         if stats['total_textboxes'] > 0:
             avg_per_image = stats['total_time'] / stats['processed_images']
             st.sidebar.metric("Avg Time/Image", f"{avg_per_image:.2f}s")
+        detection_lookups = stats['detection_cache_hits'] + stats['detection_cache_misses']
+        if detection_lookups > 0:
+            hit_rate = stats['detection_cache_hits'] / detection_lookups
+            st.sidebar.metric("Detection Cache Hit Rate", f"{hit_rate:.0%}")
+            st.sidebar.metric("Detection Time Saved", f"{stats['detection_time_saved']:.2f}s")
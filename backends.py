@@ -0,0 +1,169 @@
+"""
+Backend registry for the detection, OCR and translation stages.
+
+Every backend is a factory registered under a stage and a name, and
+Manga_Reader picks one per stage by name (or from a config file):
+
+- detector: "roboflow" (HTTP API, built into Manga_Reader), "yolo"
+  (local .pt or .onnx weights), or any factory returning an object with
+  detect(frames) -> [(boxes, scores)] per frame
+- ocr: "torch" (Manga-OCR), "onnx" (int8 ONNX Runtime), "fixture"; a
+  callable crop -> text, optionally with recognize_batch(crops, batch_size)
+- translator: "google", "echo", "dictionary"; an object with
+  translate(text) and a target attribute
+
+Factories import their dependencies when called, so registering them
+costs nothing at import time.
+
+Usage:
+    @register_backend('translator', 'upper')
+    def upper_translator(target_language):
+        ...
+    Manga_Reader(translator_backend='upper')
+"""
+
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+BACKEND_STAGES = ('detector', 'ocr', 'translator')
+
+_registry = {stage: {} for stage in BACKEND_STAGES}
+
+
+def register_backend(stage, name, factory=None):
+    """
+    Register a backend factory (usable as a decorator).
+    
+    Args:
+        stage (str): One of BACKEND_STAGES
+        name (str): Backend name, replaces any backend of that name
+        factory (callable): Builds the backend from its options
+    
+    Returns:
+        callable: The factory
+    """
+    if stage not in _registry:
+        raise ValueError(f"Unknown backend stage: {stage} (expected one of {BACKEND_STAGES})")
+    if factory is None:
+        return lambda func: register_backend(stage, name, func)
+    _registry[stage][name] = factory
+    return factory
+
+
+def available_backends(stage):
+    """Names of the backends registered for a stage, in registration order."""
+    return tuple(_registry[stage])
+
+
+def create_backend(stage, name, **options):
+    """
+    Build a backend.
+    
+    Args:
+        stage (str): One of BACKEND_STAGES
+        name (str): Registered backend name
+        **options: Passed to the factory
+    
+    Returns:
+        The backend instance
+    """
+    if name not in _registry[stage]:
+        raise ValueError(f"Unknown {stage} backend: {name} (expected one of {available_backends(stage)})")
+    return _registry[stage][name](**options)
+
+
+def load_backend_config(config):
+    """
+    Normalize a backend configuration.
+    
+    Args:
+        config (dict or str): Mapping (or path to a JSON file) of stage ->
+            backend name, or stage -> {"name": ..., other options}. A
+            "reader" entry holds other Manga_Reader arguments.
+    
+    Returns:
+        tuple: ({stage: (name, options)} for the configured stages,
+            reader arguments)
+    """
+    if isinstance(config, str):
+        with open(config, encoding="utf-8") as f:
+            config = json.load(f)
+    
+    stages = {}
+    for stage, value in config.items():
+        if stage == 'reader':
+            continue
+        if stage not in _registry:
+            raise ValueError(f"Unknown backend stage in config: {stage} (expected one of {BACKEND_STAGES})")
+        options = dict(value) if isinstance(value, dict) else {'name': value}
+        name = options.pop('name')
+        if name not in _registry[stage]:
+            raise ValueError(f"Unknown {stage} backend: {name} (expected one of {available_backends(stage)})")
+        stages[stage] = (name, options)
+    return stages, dict(config.get('reader', {}))
+
+
+# ----------------------------------------------------------------------
+# Built-in backends
+# ----------------------------------------------------------------------
+
+# Implemented by Manga_Reader's pooled HTTP client (options: api_base,
+# api_key, model_id); also used for the local Roboflow stand-in
+register_backend('detector', 'roboflow', lambda **options: None)
+
+
+@register_backend('detector', 'yolo')
+def load_yolo(weights="yolov8_manga.pt"):
+    """
+    Load a local YOLO model: .onnx exports run on ONNX Runtime without
+    ultralytics, other weights through ultralytics (imported on demand).
+    """
+    if weights.lower().endswith(".onnx"):
+        from detector_onnx import OnnxYolo
+        return OnnxYolo(weights)
+    from ultralytics import YOLO
+    return YOLO(weights)
+
+
+@register_backend('ocr', 'torch')
+def load_manga_ocr():
+    """Load Manga-OCR (downloads the weights on first run)."""
+    from manga_ocr import MangaOcr
+    return MangaOcr()
+
+
+@register_backend('ocr', 'onnx')
+def load_onnx_ocr(num_threads=None, quantized=True):
+    """Load the ONNX Runtime Manga-OCR (exported on first run)."""
+    from ocr_onnx import OnnxMangaOcr
+    return OnnxMangaOcr(quantized=quantized, num_threads=num_threads)
+
+
+@register_backend('ocr', 'fixture')
+def load_fixture_ocr(fixtures=None, path=None):
+    """Deterministic offline OCR (see standins.FixtureOcr)."""
+    from standins import FixtureOcr
+    return FixtureOcr(fixtures, path)
+
+
+@register_backend('translator', 'google')
+def google_translator(target_language, source='ja'):
+    """Google translator (deep_translator is imported on demand)."""
+    from deep_translator import GoogleTranslator
+    return GoogleTranslator(source=source, target=target_language)
+
+
+@register_backend('translator', 'echo')
+def echo_translator(target_language, source='ja'):
+    """Offline translator returning the text unchanged."""
+    from standins import EchoTranslator
+    return EchoTranslator(target_language, source)
+
+
+@register_backend('translator', 'dictionary')
+def dictionary_translator(target_language, source='ja', entries=None, path=None):
+    """Offline translator looking lines up in a dictionary (see standins.DictionaryTranslator)."""
+    from standins import DictionaryTranslator
+    return DictionaryTranslator(target_language, entries, path, source)
@@ -0,0 +1,124 @@
+"""
+Import-time benchmark with a budget.
+
+Imports each entry module in a fresh interpreter with `python -X importtime`
+and checks two things:
+- its cumulative import time stays within IMPORT_BUDGETS_MS (best of
+  --repeat runs)
+- none of the heavy dependencies that must only load on first use is
+  imported (torch, manga_ocr, deep_translator, ...)
+
+Exits with status 1 when a budget is exceeded or a deferred module is
+imported, so it can gate CI. Modules whose own dependencies are missing
+(e.g. streamlit for main) are skipped.
+
+Run: python bench_imports.py [--repeat 5] [--top 10]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Cumulative import time allowed per entry module (milliseconds)
+IMPORT_BUDGETS_MS = {
+    'reader': 400,
+    'cli': 100,
+    'main': 1500,   # Mostly streamlit itself
+}
+
+# Modules that must not be imported by an entry module (loaded on first use)
+DEFERRED_IMPORTS = {
+    'reader': ('torch', 'transformers', 'manga_ocr', 'ultralytics', 'onnxruntime',
+               'deep_translator', 'requests', 'tenacity', 'asyncio'),
+    'cli': ('torch', 'manga_ocr', 'ultralytics', 'reader'),
+    'main': ('torch', 'manga_ocr', 'ultralytics', 'reader', 'assistant', 'readOnly', 'about'),
+}
+
+
+def measure_import(module):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+    
+    Args:
+        module (str): Module name, importable from the repository root
+    
+    Returns:
+        tuple: (cumulative import time in ms, {module imported by it:
+            (cumulative ms, depth)}), or (None, error message) if the import
+            failed
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed"
+    
+    # Lines are printed as imports finish, children first: the subtree of
+    # the module is every line since the previous top-level import
+    subtree = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # Header line
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        subtree[name.strip()] = (int(cumulative) / 1000, depth)
+        if depth == 0:
+            if name.strip() == module:
+                return subtree[module][0], subtree
+            subtree = {}
+    return 0.0, subtree
+
+
+def check_module(module, repeat=3, top=10):
+    """
+    Measure one entry module against its budget and deferred imports.
+    
+    Returns:
+        tuple: (passed, report lines); passed is None if the module was skipped
+    """
+    runs = [measure_import(module) for _ in range(repeat)]
+    if runs[0][0] is None:
+        return None, [f"{module}: skipped ({runs[0][1]})"]
+    
+    best, modules = min(runs, key=lambda run: run[0])
+    budget = IMPORT_BUDGETS_MS[module]
+    leaked = [name for name in DEFERRED_IMPORTS.get(module, ()) if name in modules]
+    
+    lines = [f"{module}: {best:.0f} ms (budget {budget} ms)"]
+    direct = sorted(((ms, name) for name, (ms, depth) in modules.items() if depth == 1), reverse=True)
+    lines += [f"    {ms:7.1f} ms  {name}" for ms, name in direct[:top]]
+    if best > budget:
+        lines.append(f"  FAIL: {best:.0f} ms is over the {budget} ms budget")
+    if leaked:
+        lines.append(f"  FAIL: imports deferred modules: {', '.join(leaked)}")
+    return best <= budget and not leaked, lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check import time of the entry modules against a budget")
+    parser.add_argument("modules", nargs="*", default=list(IMPORT_BUDGETS_MS),
+                        help=f"Modules to check, among {', '.join(IMPORT_BUDGETS_MS)} (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module (the fastest is kept)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list")
+    args = parser.parse_args()
+    unknown = [module for module in args.modules if module not in IMPORT_BUDGETS_MS]
+    if unknown:
+        parser.error(f"no budget for {', '.join(unknown)}")
+    
+    failed = False
+    for module in args.modules:
+        passed, lines = check_module(module, args.repeat, args.top)
+        print("\n".join(lines))
+        failed |= passed is False
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
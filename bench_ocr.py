@@ -0,0 +1,104 @@
+"""
+OCR backend comparison: accuracy and speed on the test pages.
+
+Detects the textboxes of test/jjk*.png once, then OCRs every bubble with
+the PyTorch Manga-OCR (reference), the fp32 ONNX export and the int8 ONNX
+export. Reports time per bubble and agreement with the reference: exact
+matches and character error rate (edit distance / reference length).
+
+Run: python bench_ocr.py [--threads 4] [--batch-size 16] [--yolo yolov8_manga.pt]
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from PIL import Image
+
+from ocr_batch import OCR_BATCH_SIZE, recognize_batch
+from page import Page
+
+PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test", "jjk*.png")
+
+
+def edit_distance(a, b):
+    """Levenshtein distance between two strings."""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def detect_crops(reader_kwargs):
+    """Detect the bubbles of every test page and return their crops."""
+    from reader import Manga_Reader
+    
+    reader = Manga_Reader(warm_up=False, **reader_kwargs)
+    crops = []
+    for path in sorted(glob.glob(PAGES)):
+        page = Page(Image.open(path))
+        textboxes = reader.detect(page)
+        crops.extend(page.crop_image(textbox) for textbox in textboxes)
+        print(f"{os.path.basename(path)}: {len(textboxes)} textboxes")
+    reader.close()
+    return crops
+
+
+def run_backend(recognizer, crops, batch_size):
+    """OCR one crop to warm up, then all crops timed; returns (texts, seconds)."""
+    recognize_batch(recognizer, crops[:1], batch_size)
+    start_time = time.perf_counter()
+    texts = recognize_batch(recognizer, crops, batch_size)
+    return texts, time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the PyTorch and ONNX Manga-OCR backends")
+    parser.add_argument("--threads", type=int, default=None, help="ONNX Runtime threads (default: one per core)")
+    parser.add_argument("--batch-size", type=int, default=OCR_BATCH_SIZE, help="Crops per OCR batch")
+    parser.add_argument("--yolo", metavar="WEIGHTS", help="Detect with a local YOLO model instead of Roboflow")
+    args = parser.parse_args()
+    reader_kwargs = {'use_roboflow': False, 'detector': args.yolo} if args.yolo else {}
+    
+    crops = detect_crops(reader_kwargs)
+    if not crops:
+        print("No textboxes detected")
+        return
+    
+    from manga_ocr import MangaOcr
+    from ocr_onnx import OnnxMangaOcr
+    
+    backends = (
+        ("torch fp32", lambda: MangaOcr()),
+        ("onnx fp32", lambda: OnnxMangaOcr(quantized=False, num_threads=args.threads)),
+        ("onnx int8", lambda: OnnxMangaOcr(quantized=True, num_threads=args.threads)),
+    )
+    
+    reference = None
+    print(f"\n{len(crops)} bubbles, batch size {args.batch_size}")
+    print(f"{'backend':<12} {'load s':>7} {'ms/bubble':>10} {'speedup':>8} {'exact':>7} {'CER':>7}")
+    for name, load in backends:
+        start_time = time.perf_counter()
+        recognizer = load()
+        load_time = time.perf_counter() - start_time
+        texts, seconds = run_backend(recognizer, crops, args.batch_size)
+        
+        if reference is None:
+            reference, reference_seconds = texts, seconds
+        exact = sum(a == b for a, b in zip(reference, texts)) / len(texts)
+        errors = sum(edit_distance(a, b) for a, b in zip(reference, texts))
+        cer = errors / max(1, sum(len(text) for text in reference))
+        print(f"{name:<12} {load_time:>7.1f} {seconds / len(crops) * 1000:>10.1f} "
+              f"{reference_seconds / seconds:>7.1f}x {exact:>7.1%} {cer:>7.2%}")
+    
+    for text, onnx_text in zip(reference, texts):
+        if text != onnx_text:
+            print(f"  torch: {text}\n  int8:  {onnx_text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Startup benchmark: time until the reader and each model is ready.
+
+Compares eager loading (every model loaded before the reader is usable)
+with lazy loading plus background warm-up, where the reader is usable
+immediately and each model becomes ready on its own.
+
+Run: python bench_startup.py [--yolo yolov8_manga.pt]
+"""
+
+import argparse
+import time
+
+T0 = time.perf_counter()
+from reader import Manga_Reader  # noqa: E402 (timed import)
+IMPORT_TIME = time.perf_counter() - T0
+
+
+def format_seconds(value):
+    return "-" if value is None else f"{value:.2f}s"
+
+
+def run(warm_up, reader_kwargs):
+    """Build a reader and wait for every model, returning (construct, ready, timings)."""
+    start_time = time.perf_counter()
+    # Private models: shared ones would already be loaded by the previous run
+    reader = Manga_Reader(use_cache=False, warm_up=warm_up, share_models=False, **reader_kwargs)
+    construct_time = time.perf_counter() - start_time
+    
+    if warm_up:
+        reader.wait_until_ready()
+    else:
+        for model in reader._models.values():
+            model.get()
+    ready_time = time.perf_counter() - start_time
+    
+    timings = reader.model_timings()
+    reader.close()
+    return construct_time, ready_time, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure reader startup time per component")
+    parser.add_argument("--yolo", metavar="WEIGHTS", help="Benchmark a local YOLO detector instead of Roboflow")
+    args = parser.parse_args()
+    reader_kwargs = {'use_roboflow': False, 'detector': args.yolo} if args.yolo else {}
+    
+    print(f"import reader: {IMPORT_TIME:.2f}s")
+    # The first run also pays cold disk reads of the weights: run the script
+    # twice to compare warm starts
+    for label, warm_up in (("eager", False), ("lazy + warm-up", True)):
+        construct_time, ready_time, timings = run(warm_up, reader_kwargs)
+        usable = construct_time if warm_up else ready_time
+        print(f"\n{label}: usable after {usable:.2f}s, all models ready after {ready_time:.2f}s")
+        print(f"  {'component':<10} {'load':>8} {'ready':>8}")
+        for name, timing in timings.items():
+            print(f"  {name:<10} {format_seconds(timing['load_time']):>8} {format_seconds(timing['time_to_ready']):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Microbenchmark: text wrapping time vs text length.
+
+Compares the previous wrapping (getbbox of the whole growing line for
+every word, quadratic in line length) with rendering.wrap_text (cached
+word widths summed up incrementally, linear).
+
+Run: python bench_wrap.py
+"""
+
+import os
+import random
+import time
+
+from PIL import ImageFont
+
+from rendering import wrap_text, clear_font_cache
+
+FONT_PATH = os.path.join(os.path.dirname(__file__), "font", "arial.ttf")
+FONT_SIZE = 20
+WORD_COUNTS = (25, 50, 100, 200, 400, 800)
+MAX_WIDTHS = (200, 2000)  # Bubble width and a very wide line (long lines show the quadratic cost)
+REPEAT = 5
+
+WORDS = "Đây là một đoạn văn bản rất dài để kiểm tra xem hàm wrap text có hoạt động tốt không".split()
+
+
+def legacy_wrap_text(text, font, max_width):
+    """Wrapping as it was before rendering.wrap_text."""
+    words = text.split()
+    lines = []
+    current_line = ""
+    
+    for word in words:
+        test_line = current_line + word + " " if current_line else word + " "
+        bbox = font.getbbox(test_line)
+        line_width = bbox[2] - bbox[0]
+        
+        if line_width <= max_width:
+            current_line = test_line
+        else:
+            if current_line:
+                lines.append(current_line.strip())
+            current_line = word + " "
+    
+    if current_line:
+        lines.append(current_line.strip())
+    
+    return lines
+
+
+def best_time(func, *args):
+    """Fastest of REPEAT runs, in milliseconds."""
+    times = []
+    for _ in range(REPEAT):
+        start_time = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start_time)
+    return min(times) * 1000
+
+
+def cold_wrap(text, font, max_width):
+    """wrap_text with empty metric caches (first time a text is measured)."""
+    clear_font_cache()
+    return wrap_text(text, font, max_width)
+
+
+def main():
+    random.seed(0)
+    font = ImageFont.truetype(FONT_PATH, FONT_SIZE)
+    
+    print(f"{'width':>6} {'words':>6} {'legacy ms':>10} {'cold ms':>9} {'warm ms':>9} {'speedup':>8}")
+    for max_width in MAX_WIDTHS:
+        for count in WORD_COUNTS:
+            text = " ".join(random.choice(WORDS) for _ in range(count))
+            legacy = best_time(legacy_wrap_text, text, font, max_width)
+            cold = best_time(cold_wrap, text, font, max_width)
+            warm = best_time(wrap_text, text, font, max_width)
+            print(f"{max_width:>6} {count:>6} {legacy:>10.2f} {cold:>9.2f} {warm:>9.2f} {legacy / cold:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
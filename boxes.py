@@ -0,0 +1,138 @@
+"""
+Vectorized textbox post-processing.
+
+Textboxes are handled as an (N, 4) NumPy array of [x1, y1, x2, y2] rows so
+overlap tests run over all boxes at once instead of pair by pair in Python.
+postprocess_boxes() cleans detector output before OCR: boxes are clipped
+to the page, tiny boxes are dropped and duplicate or nested boxes are
+merged, so every bubble is OCR'd and translated once.
+"""
+
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Boxes overlapping more than this (intersection over union) are duplicates
+NMS_IOU_THRESHOLD = 0.5
+
+# A box lying this much inside another one (intersection over the smaller
+# area) is the same bubble detected twice
+CONTAINMENT_THRESHOLD = 0.85
+
+# Boxes smaller than this (pixels) cannot hold readable text
+MIN_BOX_AREA = 400
+
+
+def as_box_array(textboxes):
+    """
+    Convert textboxes to an (N, 4) float array.
+    
+    Args:
+        textboxes (list): [x1, y1, x2, y2] boxes (or an array of them)
+    
+    Returns:
+        np.ndarray: Boxes, shape (N, 4)
+    """
+    return np.asarray(textboxes, dtype=np.float64).reshape(-1, 4)
+
+
+def box_areas(boxes):
+    """Area of every box of an (N, 4) array (0 for inverted boxes)."""
+    return (boxes[:, 2] - boxes[:, 0]).clip(0) * (boxes[:, 3] - boxes[:, 1]).clip(0)
+
+
+def intersections(box, boxes):
+    """Intersection area between one box and every box of an (N, 4) array."""
+    width = (np.minimum(box[2], boxes[:, 2]) - np.maximum(box[0], boxes[:, 0])).clip(0)
+    height = (np.minimum(box[3], boxes[:, 3]) - np.maximum(box[1], boxes[:, 1])).clip(0)
+    return width * height
+
+
+def clip_boxes(boxes, size):
+    """
+    Clip an (N, 4) box array to the image bounds (in place).
+    
+    Args:
+        boxes (np.ndarray): Boxes, shape (N, 4)
+        size (tuple): Image (width, height)
+    
+    Returns:
+        np.ndarray: The clipped boxes
+    """
+    width, height = size
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+    return boxes
+
+
+def nms(textboxes, scores=None, iou_threshold=NMS_IOU_THRESHOLD, containment_threshold=None):
+    """
+    Non-maximum suppression.
+    
+    Boxes are visited from the highest score down. Each kept box suppresses
+    every remaining box that overlaps it by more than iou_threshold, with
+    one vectorized IoU computation against all remaining boxes.
+    
+    Args:
+        textboxes (list): [x1, y1, x2, y2] boxes
+        scores (list): Score per box (higher is kept first). Defaults to the
+            box area, so the most complete of several duplicates survives.
+        iou_threshold (float): Overlap above which a box is suppressed
+        containment_threshold (float): Also suppress boxes nested in a kept
+            box (or containing it) by more than this share of the smaller
+            box. None disables the containment test.
+    
+    Returns:
+        list: Indices of the kept boxes, highest score first
+    """
+    boxes = as_box_array(textboxes)
+    if len(boxes) == 0:
+        return []
+    
+    areas = box_areas(boxes)
+    scores = areas if scores is None else np.asarray(scores, dtype=np.float64)
+    order = np.argsort(-scores, kind='stable')
+    
+    keep = []
+    while len(order) > 0:
+        best, rest = order[0], order[1:]
+        keep.append(int(best))
+        inter = intersections(boxes[best], boxes[rest])
+        union = areas[best] + areas[rest] - inter
+        iou = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+        duplicate = iou > iou_threshold
+        if containment_threshold is not None:
+            smaller = np.minimum(areas[best], areas[rest])
+            contained = np.divide(inter, smaller, out=np.zeros_like(inter), where=smaller > 0)
+            duplicate |= contained > containment_threshold
+        order = rest[~duplicate]
+    
+    return keep
+
+
+def postprocess_boxes(textboxes, size, scores=None, iou_threshold=NMS_IOU_THRESHOLD,
+                      containment_threshold=CONTAINMENT_THRESHOLD, min_area=MIN_BOX_AREA):
+    """
+    Clean up detector output: clip, drop tiny boxes, merge duplicates.
+    
+    Args:
+        textboxes (list): [x1, y1, x2, y2] boxes from the detector
+        size (tuple): Image (width, height)
+        scores (list): Detector confidence per box (None = prefer larger boxes)
+        iou_threshold (float): IoU above which two boxes are duplicates
+        containment_threshold (float): Nesting ratio above which two boxes
+            are duplicates
+        min_area (int): Smallest area kept, in pixels (after clipping)
+    
+    Returns:
+        list: Integer [x1, y1, x2, y2] boxes, in detector order
+    """
+    boxes = clip_boxes(as_box_array(textboxes), size)
+    valid = box_areas(boxes) >= max(min_area, 1)
+    boxes = boxes[valid]
+    if scores is not None:
+        scores = np.asarray(scores, dtype=np.float64)[valid]
+    
+    keep = sorted(nms(boxes, scores, iou_threshold, containment_threshold))
+    return boxes[keep].astype(int).tolist()
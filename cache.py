@@ -0,0 +1,345 @@
+"""
+Disk-backed caches for the Manga Reader pipeline.
+
+Caches are stored in SQLite files under CACHE_DIR (override with the
+MANGA_READER_CACHE_DIR environment variable) and are shared by every
+Manga_Reader instance in the process through get_translation_cache()
+and get_detection_cache().
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import json
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv(
+    "MANGA_READER_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+
+# Maximum number of entries kept on disk before the least recently used
+# ones are evicted
+TRANSLATION_CACHE_MAX_ENTRIES = 50000
+DETECTION_CACHE_MAX_ENTRIES = 20000
+
+
+class _SQLiteCache:
+    """
+    Base class: one SQLite table with a last_used column for LRU eviction.
+    
+    Subclasses set TABLE, FILENAME and SCHEMA. All methods are thread-safe.
+    """
+    TABLE = None
+    FILENAME = None
+    SCHEMA = None
+    
+    def __init__(self, path=None, max_entries=None):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, self.FILENAME)
+        
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(self.SCHEMA)
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{self.TABLE}_last_used ON {self.TABLE} (last_used)"
+            )
+        logger.info(f"{type(self).__name__} opened: {path}")
+    
+    def _evict(self):
+        """Delete least recently used entries beyond max_entries (lock held)."""
+        count = self._conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.TABLE} WHERE rowid IN "
+                f"(SELECT rowid FROM {self.TABLE} ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+            logger.info(f"{type(self).__name__}: evicted {excess} entries")
+    
+    def clear(self):
+        """
+        Delete every entry.
+        
+        Returns:
+            int: Number of deleted entries
+        """
+        with self._lock, self._conn:
+            return self._conn.execute(f"DELETE FROM {self.TABLE}").rowcount
+    
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+    
+    def stats(self):
+        """Get cache statistics."""
+        return {
+            'entries': len(self),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+    
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class TranslationCache(_SQLiteCache):
+    """
+    SQLite translation cache keyed by (source text, source lang, target lang).
+    
+    Entries are evicted least-recently-used first once the cache holds more
+    than max_entries rows. All methods are thread-safe.
+    """
+    TABLE = "translations"
+    FILENAME = "translations.sqlite3"
+    SCHEMA = """CREATE TABLE IF NOT EXISTS translations (
+        source_text TEXT NOT NULL,
+        source_lang TEXT NOT NULL,
+        target_lang TEXT NOT NULL,
+        translated TEXT NOT NULL,
+        last_used REAL NOT NULL,
+        PRIMARY KEY (source_text, source_lang, target_lang)
+    )"""
+    
+    def __init__(self, path=None, max_entries=TRANSLATION_CACHE_MAX_ENTRIES):
+        """
+        Open (or create) a translation cache.
+        
+        Args:
+            path (str): SQLite file path (default: CACHE_DIR/translations.sqlite3)
+            max_entries (int): Maximum number of cached translations
+        """
+        super().__init__(path, max_entries)
+    
+    def get_many(self, texts, source_lang, target_lang):
+        """
+        Look up several texts at once.
+        
+        Args:
+            texts (list): Source texts
+            source_lang (str): Source language code
+            target_lang (str): Target language code
+        
+        Returns:
+            dict: source text -> cached translation, for the texts that were found
+        """
+        unique = list(dict.fromkeys(texts))
+        found = {}
+        
+        with self._lock, self._conn:
+            for text in unique:
+                row = self._conn.execute(
+                    "SELECT translated FROM translations "
+                    "WHERE source_text = ? AND source_lang = ? AND target_lang = ?",
+                    (text, source_lang, target_lang)
+                ).fetchone()
+                if row is not None:
+                    found[text] = row[0]
+            
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE translations SET last_used = ? "
+                    "WHERE source_text = ? AND source_lang = ? AND target_lang = ?",
+                    [(now, text, source_lang, target_lang) for text in found]
+                )
+            
+            self.hits += len(found)
+            self.misses += len(unique) - len(found)
+        
+        return found
+    
+    def get(self, text, source_lang, target_lang):
+        """Return the cached translation of text, or None."""
+        return self.get_many([text], source_lang, target_lang).get(text)
+    
+    def set_many(self, translations, source_lang, target_lang):
+        """
+        Store several translations and evict old entries if needed.
+        
+        Args:
+            translations (dict): source text -> translated text
+            source_lang (str): Source language code
+            target_lang (str): Target language code
+        """
+        if not translations:
+            return
+        
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations "
+                "(source_text, source_lang, target_lang, translated, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(text, source_lang, target_lang, translated, now)
+                 for text, translated in translations.items()]
+            )
+            self._evict()
+    
+    def set(self, text, source_lang, target_lang, translated):
+        """Store a single translation."""
+        self.set_many({text: translated}, source_lang, target_lang)
+    
+    def invalidate(self, target_lang=None, source_lang=None):
+        """
+        Delete cached translations.
+        
+        Args:
+            target_lang (str): Only delete translations into this language
+            source_lang (str): Only delete translations from this language
+        
+        Returns:
+            int: Number of deleted entries
+        """
+        query = "DELETE FROM translations"
+        conditions = []
+        params = []
+        if target_lang is not None:
+            conditions.append("target_lang = ?")
+            params.append(target_lang)
+        if source_lang is not None:
+            conditions.append("source_lang = ?")
+            params.append(source_lang)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        with self._lock, self._conn:
+            deleted = self._conn.execute(query, params).rowcount
+        
+        logger.info(f"Translation cache: invalidated {deleted} entries")
+        return deleted
+
+
+
+class DetectionCache(_SQLiteCache):
+    """
+    SQLite cache of detected textboxes.
+    
+    Keys are built by make_key() from a hash of the page pixels plus the
+    detector identity and confidence threshold, so a page that has already
+    been seen by the same detector skips detection completely. The
+    detection latency is stored with each entry to report saved time.
+    """
+    TABLE = "detections"
+    FILENAME = "detections.sqlite3"
+    SCHEMA = """CREATE TABLE IF NOT EXISTS detections (
+        cache_key TEXT PRIMARY KEY,
+        boxes TEXT NOT NULL,
+        detection_time REAL NOT NULL,
+        last_used REAL NOT NULL
+    )"""
+    
+    def __init__(self, path=None, max_entries=DETECTION_CACHE_MAX_ENTRIES):
+        """
+        Open (or create) a detection cache.
+        
+        Args:
+            path (str): SQLite file path (default: CACHE_DIR/detections.sqlite3)
+            max_entries (int): Maximum number of cached pages
+        """
+        super().__init__(path, max_entries)
+    
+    @staticmethod
+    def make_key(img, detector_id, confidence):
+        """
+        Build a content-addressed cache key.
+        
+        Args:
+            img (PIL.Image): Page image
+            detector_id (str): Identity of the detector (model id or weights)
+            confidence: Detection confidence threshold
+        
+        Returns:
+            str: Hex digest identifying (pixels, detector, confidence)
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{img.mode}|{img.size[0]}x{img.size[1]}|".encode("utf-8"))
+        digest.update(img.tobytes())
+        digest.update(f"|{detector_id}|{confidence}".encode("utf-8"))
+        return digest.hexdigest()
+    
+    def get(self, cache_key):
+        """
+        Look up a page.
+        
+        Args:
+            cache_key (str): Key from make_key()
+        
+        Returns:
+            tuple: (textboxes, detection_time) or None if the page is not cached
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT boxes, detection_time FROM detections WHERE cache_key = ?",
+                (cache_key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            
+            self._conn.execute(
+                "UPDATE detections SET last_used = ? WHERE cache_key = ?",
+                (time.time(), cache_key)
+            )
+            self.hits += 1
+        
+        return json.loads(row[0]), row[1]
+    
+    def set(self, cache_key, textboxes, detection_time):
+        """
+        Store the textboxes detected on a page.
+        
+        Args:
+            cache_key (str): Key from make_key()
+            textboxes (list): Textboxes as [x1, y1, x2, y2]
+            detection_time (float): Seconds the detection took
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO detections (cache_key, boxes, detection_time, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (cache_key, json.dumps(textboxes), detection_time, time.time())
+            )
+            self._evict()
+
+
+_translation_cache = None
+_translation_cache_lock = threading.Lock()
+
+
+def get_translation_cache():
+    """Return the process-wide translation cache, creating it on first use."""
+    global _translation_cache
+    with _translation_cache_lock:
+        if _translation_cache is None:
+            _translation_cache = TranslationCache()
+        return _translation_cache
+
+
+_detection_cache = None
+_detection_cache_lock = threading.Lock()
+
+
+def get_detection_cache():
+    """Return the process-wide detection cache, creating it on first use."""
+    global _detection_cache
+    with _detection_cache_lock:
+        if _detection_cache is None:
+            _detection_cache = DetectionCache()
+        return _detection_cache
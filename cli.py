@@ -0,0 +1,241 @@
+"""
+Headless batch translator.
+
+Translates directories or globs of manga pages without the Streamlit UI,
+fanning pages out across a process pool with one Manga_Reader per worker.
+
+Run: python cli.py test/ "chapters/**/*.png" -o translated -l en
+"""
+
+import argparse
+import glob
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+# Manga_Reader of the current worker process, created once by _init_worker
+_reader = None
+
+
+def collect_pages(inputs):
+    """
+    Expand input directories, globs and files into page paths.
+    
+    Args:
+        inputs (list): Directories, glob patterns or image files
+    
+    Returns:
+        list: (page path, output name) pairs, without duplicates. Pages found
+            in a directory (or by a glob) keep their path relative to it (to
+            the glob's directory prefix) in the output name; names that would
+            still write the same output file get a numeric suffix.
+    """
+    pages = {}
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            for root, _, files in os.walk(pattern):
+                for name in sorted(files):
+                    if name.lower().endswith(IMAGE_EXTENSIONS):
+                        path = os.path.join(root, name)
+                        pages.setdefault(os.path.abspath(path), os.path.relpath(path, pattern))
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+            base = _glob_base(pattern)
+            for path in matches:
+                if os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS):
+                    name = os.path.relpath(path, base) if base is not None else os.path.basename(path)
+                    pages.setdefault(os.path.abspath(path), name)
+                elif not os.path.exists(path):
+                    logger.warning(f"No pages found for: {pattern}")
+    
+    # Outputs are written as <name without extension>.png
+    outputs = set()
+    for path, name in sorted(pages.items(), key=lambda item: item[1]):
+        stem, ext = os.path.splitext(name)
+        unique, count = stem, 1
+        while unique.lower() in outputs:
+            count += 1
+            unique = f"{stem}-{count}"
+        outputs.add(unique.lower())
+        pages[path] = unique + ext
+    
+    return sorted(pages.items(), key=lambda item: item[1])
+
+
+def _glob_base(pattern):
+    """Directory part of a glob pattern before its first wildcard (None if it has none)."""
+    if not glob.has_magic(pattern):
+        return None
+    parts = []
+    for part in os.path.normpath(pattern).split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return os.sep.join(parts) or os.curdir
+
+
+def create_reader(reader_kwargs):
+    """Build a Manga_Reader from the CLI reader arguments."""
+    from reader import Manga_Reader
+    
+    reader_kwargs = dict(reader_kwargs)
+    backend_config = reader_kwargs.pop('backend_config', None)
+    if backend_config:
+        return Manga_Reader.from_config(backend_config, **reader_kwargs)
+    return Manga_Reader(**reader_kwargs)
+
+
+def _init_worker(reader_kwargs, log_level, threads):
+    """
+    Load one Manga_Reader per worker process.
+    
+    Args:
+        reader_kwargs (dict): Manga_Reader arguments (see create_reader)
+        log_level (int): Logging level of the worker
+        threads (int): Threads the OCR model may use, so that workers x
+            threads does not oversubscribe the cores
+    """
+    global _reader
+    logging.getLogger().setLevel(log_level)
+    _reader = create_reader({**reader_kwargs, 'onnx_threads': threads})
+    if _reader.ocr_backend == 'torch':
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass  # Reported when the OCR model loads
+
+
+def _process_page(path, output_path):
+    """
+    Translate one page in a worker process.
+    
+    Returns:
+        tuple: (path, number of textboxes, seconds, error message or None)
+    """
+    from PIL import Image
+    
+    start_time = time.time()
+    try:
+        stats_before = _reader.get_stats()
+        with Image.open(path) as image:
+            image.load()
+            result = _reader(image)
+        
+        # The reader recovers from detection, OCR and translation errors and
+        # returns the page as it is: count those pages as failed
+        stats = _reader.get_stats()
+        if stats['errors'] > stats_before['errors']:
+            return path, 0, time.time() - start_time, _reader.last_error
+        
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        result.save(output_path)
+        textboxes = stats['total_textboxes'] - stats_before['total_textboxes']
+        return path, textboxes, time.time() - start_time, None
+    except Exception as e:
+        return path, 0, time.time() - start_time, str(e)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Translate manga pages in batch (detect -> OCR -> translate -> render)."
+    )
+    parser.add_argument("inputs", nargs="+", help="Page files, directories or glob patterns")
+    parser.add_argument("-o", "--output-dir", default="translated", help="Output directory (default: translated)")
+    parser.add_argument("-l", "--language", help="Target language code (default: vi, or the --backends config's)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: number of cores)")
+    parser.add_argument("--yolo", metavar="WEIGHTS", help="Use a local YOLO model instead of Roboflow")
+    parser.add_argument("--backends", metavar="CONFIG",
+                        help="JSON file choosing the detector/OCR/translator backends (see backends.py)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Disable translation and detection caches (default: enabled, or the --backends config's)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only log warnings and errors")
+    return parser
+
+
+def main(argv=None):
+    """
+    Run the batch translator.
+    
+    Returns:
+        int: Exit code (1 if any page failed)
+    """
+    args = build_parser().parse_args(argv)
+    log_level = logging.WARNING if args.quiet else logging.INFO
+    logging.basicConfig(level=log_level)
+    logging.getLogger().setLevel(log_level)
+    
+    pages = collect_pages(args.inputs)
+    if not pages:
+        print("No pages found.")
+        return 1
+    
+    # Only flags given on the command line are forwarded, so they do not
+    # override the "reader" entry of a --backends config with defaults
+    reader_kwargs = {}
+    if args.language:
+        reader_kwargs['target_language'] = args.language
+    if args.no_cache:
+        reader_kwargs['use_cache'] = False
+    if args.yolo:
+        reader_kwargs.update(detector=args.yolo, use_roboflow=False)
+    if args.backends:
+        reader_kwargs['backend_config'] = os.path.abspath(args.backends)
+    
+    # Check the configuration (API key, backends, ...) once here: a worker
+    # failing in its initializer would only surface as a broken pool
+    try:
+        reader = create_reader({**reader_kwargs, 'warm_up': False})
+        language = reader.target_language
+        reader.close()
+    except Exception as e:
+        print(f"Cannot create the reader: {e}")
+        return 1
+    
+    workers = max(1, min(args.workers, len(pages)))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"Translating {len(pages)} pages to '{language}' with {workers} worker(s) x {threads} thread(s)...")
+    
+    start_time = time.time()
+    total_textboxes = 0
+    failed = 0
+    
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(reader_kwargs, log_level, threads)) as executor:
+            futures = []
+            for path, name in pages:
+                output_path = os.path.join(args.output_dir, os.path.splitext(name)[0] + '.png')
+                futures.append(executor.submit(_process_page, path, output_path))
+            
+            for done, future in enumerate(as_completed(futures), start=1):
+                path, textboxes, elapsed, error = future.result()
+                if error:
+                    failed += 1
+                    print(f"[{done}/{len(pages)}] FAIL {path}: {error}")
+                else:
+                    total_textboxes += textboxes
+                    print(f"[{done}/{len(pages)}] OK   {path} ({textboxes} textboxes, {elapsed:.2f}s)")
+    except BrokenProcessPool:
+        print("A worker process died while loading the reader or translating a page (see the log above).")
+        return 1
+    
+    elapsed_time = time.time() - start_time
+    processed = len(pages) - failed
+    print(f"\nDone: {processed}/{len(pages)} pages in {elapsed_time:.2f}s")
+    print(f"Throughput: {processed / elapsed_time:.2f} pages/s, {total_textboxes / elapsed_time:.2f} bubbles/s")
+    print(f"Output: {os.path.abspath(args.output_dir)}")
+    
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Local YOLO detection on ONNX Runtime, without ultralytics.
+
+Loading yolov8_manga.pt goes through ultralytics and PyTorch, which take
+seconds to import and run slowly on CPU. A YOLOv8 model exported to ONNX
+(export_yolo_onnx, the only step that needs ultralytics) is run here with
+onnxruntime: pages are letterboxed with NumPy, and the raw predictions are
+decoded, thresholded and deduplicated with vectorized NumPy and boxes.nms.
+
+Select it by passing an .onnx file as detector:
+    Manga_Reader(use_roboflow=False, detector="yolov8_manga.onnx")
+"""
+
+import logging
+import os
+import numpy as np
+from PIL import Image
+
+from boxes import as_box_array, nms
+
+logger = logging.getLogger(__name__)
+
+# Model input side when the exported model has a dynamic input shape
+YOLO_INPUT_SIZE = 640
+
+# Same defaults as ultralytics predict()
+YOLO_CONF_THRESHOLD = 0.25
+YOLO_IOU_THRESHOLD = 0.7
+
+# Padding color of letterboxed pages (ultralytics uses the same gray)
+LETTERBOX_COLOR = 114
+
+# ONNX Runtime intra-op threads (None = one per physical core)
+YOLO_NUM_THREADS = None
+
+
+def export_yolo_onnx(weights, input_size=YOLO_INPUT_SIZE):
+    """
+    Export a YOLOv8 .pt model to ONNX with a dynamic batch size.
+    
+    Args:
+        weights (str): Path to the .pt weights
+        input_size (int): Square input side of the exported model
+    
+    Returns:
+        str: Path to the .onnx file (next to the weights)
+    """
+    from ultralytics import YOLO
+    
+    path = YOLO(weights).export(format="onnx", imgsz=input_size, dynamic=True, simplify=True)
+    logger.info(f"Exported {weights} to {path}")
+    return path
+
+
+def letterbox(image, size=YOLO_INPUT_SIZE):
+    """
+    Resize a page into a size x size square, keeping its aspect ratio.
+    
+    Args:
+        image (PIL.Image): Page (converted to RGB if needed)
+        size (int): Square side
+    
+    Returns:
+        tuple: ((size, size, 3) uint8 array, scale, (pad_x, pad_y)), where a
+            page point (x, y) is at (x * scale + pad_x, y * scale + pad_y)
+    """
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    width, height = image.size
+    scale = min(size / width, size / height)
+    new_width, new_height = max(1, round(width * scale)), max(1, round(height * scale))
+    pad_x, pad_y = (size - new_width) // 2, (size - new_height) // 2
+    
+    canvas = np.full((size, size, 3), LETTERBOX_COLOR, dtype=np.uint8)
+    resized = image if (new_width, new_height) == image.size else image.resize((new_width, new_height), Image.BILINEAR)
+    canvas[pad_y:pad_y + new_height, pad_x:pad_x + new_width] = np.asarray(resized)
+    return canvas, scale, (pad_x, pad_y)
+
+
+def decode_predictions(prediction, scale, pad, image_size, conf_threshold=YOLO_CONF_THRESHOLD,
+                       iou_threshold=YOLO_IOU_THRESHOLD):
+    """
+    Decode the raw YOLOv8 output of one image into page boxes.
+    
+    Args:
+        prediction (np.ndarray): (4 + classes, anchors) rows of cx, cy, w, h
+            followed by one score per class, in letterbox pixels
+        scale (float): Letterbox scale, from letterbox()
+        pad (tuple): Letterbox (pad_x, pad_y), from letterbox()
+        image_size (tuple): Page (width, height)
+        conf_threshold (float): Lowest class score kept
+        iou_threshold (float): NMS overlap threshold (per class)
+    
+    Returns:
+        tuple: ((N, 4) [x1, y1, x2, y2] boxes in page pixels, (N,) scores),
+            highest score first
+    """
+    class_scores = prediction[4:]
+    classes = class_scores.argmax(axis=0)
+    scores = class_scores[classes, np.arange(class_scores.shape[1])]
+    keep = scores > conf_threshold
+    if not keep.any():
+        return np.zeros((0, 4)), np.zeros(0)
+    
+    cx, cy, w, h = prediction[:4, keep]
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    boxes -= np.array([pad[0], pad[1], pad[0], pad[1]], dtype=boxes.dtype)
+    boxes /= scale
+    width, height = image_size
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+    scores, classes = scores[keep], classes[keep]
+    
+    # Offsetting every class by more than the page size keeps NMS within a class
+    offset = classes[:, None] * float(max(width, height) + 1)
+    kept = nms(boxes + offset, scores, iou_threshold)
+    return as_box_array(boxes[kept]), scores[kept]
+
+
+class OnnxYolo:
+    """
+    YOLOv8 detector exported to ONNX, run with onnxruntime on CPU.
+    
+    Usage:
+        detector = OnnxYolo("yolov8_manga.onnx")
+        [(boxes, scores)] = detector.detect([page])
+    """
+    
+    def __init__(self, path, num_threads=YOLO_NUM_THREADS, conf_threshold=YOLO_CONF_THRESHOLD,
+                 iou_threshold=YOLO_IOU_THRESHOLD):
+        """
+        Load an exported model.
+        
+        Args:
+            path (str): .onnx file (see export_yolo_onnx)
+            num_threads (int): ONNX Runtime intra-op threads (None = default)
+            conf_threshold (float): Lowest score kept
+            iou_threshold (float): NMS overlap threshold
+        """
+        import onnxruntime as ort
+        
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"ONNX detector not found: {path} (export it with detector_onnx.py)")
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self._configure_input()
+        logger.info(f"ONNX detector loaded: {path} (input {self.input_size}, batch {self.max_batch or 'dynamic'})")
+    
+    def _configure_input(self):
+        """Read input name, side and batch size from the model (dynamic axes are strings)."""
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _, height, _ = model_input.shape
+        self.input_size = height if isinstance(height, int) else YOLO_INPUT_SIZE
+        self.max_batch = batch if isinstance(batch, int) else None
+    
+    def detect(self, frames):
+        """
+        Detect boxes in several pages, in as few forward passes as the model allows.
+        
+        Args:
+            frames (list): RGB page images (PIL.Image)
+        
+        Returns:
+            list: One ((N, 4) boxes, (N,) scores) pair per frame, in page pixels
+        """
+        letterboxed = [letterbox(frame, self.input_size) for frame in frames]
+        batch = np.stack([canvas for canvas, _, _ in letterboxed])
+        batch = np.ascontiguousarray(batch.transpose(0, 3, 1, 2), dtype=np.float32) / 255.0
+        
+        step = self.max_batch or len(frames)
+        predictions = np.concatenate([
+            self.session.run(None, {self.input_name: batch[start:start + step]})[0]
+            for start in range(0, len(frames), step)
+        ])
+        
+        return [
+            decode_predictions(prediction, scale, pad, frame.size, self.conf_threshold, self.iou_threshold)
+            for prediction, frame, (_, scale, pad) in zip(predictions, frames, letterboxed)
+        ]
+
+
+if __name__ == "__main__":
+    import sys
+    
+    logging.basicConfig(level=logging.INFO)
+    export_yolo_onnx(sys.argv[1] if len(sys.argv) > 1 else "yolov8_manga.pt")
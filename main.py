@@ -1,8 +1,5 @@
 import streamlit as st
 from streamlit_option_menu import option_menu
-import about
-import assistant
-import readOnly
 import logging
 
 # Setup logging
@@ -33,13 +30,17 @@ def main():
                 default_index=0
             )
         
-        # Route to selected page
+        # Route to selected page. Pages are imported when their tab is chosen:
+        # only Assistant needs the reader and its models.
         try:
             if app == "Assistant":
+                import assistant
                 assistant.app()
             elif app == "Read Only":
+                import readOnly
                 readOnly.app()
             elif app == "About":
+                import about
                 about.app()
         except Exception as e:
             logger.error(f"Error in app routing: {e}")
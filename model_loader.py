@@ -0,0 +1,170 @@
+"""
+Lazy loading of heavy models.
+
+Manga-OCR (a transformer) and the local YOLO detector take seconds to load.
+Each one is wrapped in a LazyModel that loads on first use, so a reader
+that only detects never loads Manga-OCR. A background warm-up thread can
+start loading at construction; a request that needs a model the thread
+has not reached yet loads it right away instead of waiting behind the
+others, since every model has its own lock.
+
+Models are shared by every reader of the process through
+get_shared_model(): readers for several target languages hold the same
+Manga-OCR and YOLO weights and only differ by their translator.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Order in which the warm-up thread loads models (first needed first)
+WARMUP_ORDER = ('detector', 'ocr')
+
+
+class LazyModel:
+    """
+    A model loaded once, on first use or by a warm-up thread.
+    
+    Usage:
+        ocr = LazyModel('ocr', MangaOcr)
+        ocr.get()(crop)   # loads on the first call, thread-safe
+    """
+    
+    def __init__(self, name, loader):
+        """
+        Args:
+            name (str): Component name, used in logs and timings
+            loader (callable): Builds the model, called without arguments
+        """
+        self.name = name
+        self._loader = loader
+        self._lock = threading.Lock()
+        # Held around calls into models that are not thread-safe (ultralytics),
+        # by every reader sharing this model
+        self.call_lock = threading.Lock()
+        self._value = None
+        self._loaded = False
+        self.created_at = time.perf_counter()
+        self.load_time = None   # Seconds spent in loader
+        self.ready_at = None    # perf_counter() when the model became ready
+        self.wait_time = 0.0    # Seconds callers spent blocked on loading
+    
+    @property
+    def loaded(self):
+        return self._loaded
+    
+    def get(self):
+        """Return the model, loading it first if needed."""
+        if self._loaded:
+            return self._value
+        
+        start_time = time.perf_counter()
+        with self._lock:
+            if not self._loaded:
+                self._load()
+        self.wait_time += time.perf_counter() - start_time
+        return self._value
+    
+    def _load(self):
+        start_time = time.perf_counter()
+        try:
+            value = self._loader()
+        except Exception as e:
+            logger.error(f"Error loading {self.name}: {e}")
+            raise
+        self.load_time = time.perf_counter() - start_time
+        self._set(value)
+        logger.info(f"Loaded {self.name} in {self.load_time:.2f}s")
+    
+    def _set(self, value):
+        self._value = value
+        self._loaded = True
+        self.ready_at = time.perf_counter()
+    
+    def set(self, value):
+        """Replace the model (it is then considered loaded)."""
+        with self._lock:
+            self._set(value)
+    
+    def warm_up(self):
+        """Load the model if it is not loaded yet, logging instead of raising."""
+        try:
+            self.get()
+        except Exception:
+            pass  # Logged by _load, retried on first use
+    
+    def timings(self):
+        """
+        Get loading times.
+        
+        Returns:
+            dict: loaded, load_time (seconds in the loader), time_to_ready
+                (seconds from creation until ready) and wait_time (seconds
+                callers were blocked)
+        """
+        return {
+            'loaded': self._loaded,
+            'load_time': self.load_time,
+            'time_to_ready': None if self.ready_at is None else self.ready_at - self.created_at,
+            'wait_time': self.wait_time,
+        }
+
+
+def start_warmup(models, order=WARMUP_ORDER):
+    """
+    Load models in a background daemon thread.
+    
+    Args:
+        models (dict): name -> LazyModel
+        order (tuple): Names loaded first, the others follow
+    
+    Returns:
+        threading.Thread: The started warm-up thread
+    """
+    names = [name for name in order if name in models]
+    names += [name for name in models if name not in names]
+    
+    def run():
+        for name in names:
+            models[name].warm_up()
+    
+    thread = threading.Thread(target=run, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+_shared_models = {}
+_shared_models_lock = threading.Lock()
+
+
+def get_shared_model(name, key, loader):
+    """
+    Return the process-wide LazyModel for a key, creating it on first use.
+    
+    Args:
+        name (str): Component name ('ocr', 'detector')
+        key (str): Identifies the weights (e.g. path and mtime of a YOLO model)
+        loader (callable): Builds the model if nobody has yet
+    
+    Returns:
+        LazyModel: The model shared by every reader asking for this key
+    """
+    with _shared_models_lock:
+        model = _shared_models.get((name, key))
+        if model is None:
+            model = _shared_models[(name, key)] = LazyModel(name, loader)
+        return model
+
+
+def shared_model_count():
+    """Number of distinct models in the process-wide registry (loaded or not)."""
+    with _shared_models_lock:
+        return len(_shared_models)
+
+
+def clear_shared_models():
+    """Forget every shared model (readers keep the ones they hold)."""
+    with _shared_models_lock:
+        _shared_models.clear()
@@ -0,0 +1,86 @@
+"""
+Cheap pre-OCR filtering of textboxes.
+
+Detectors also return blank panels, screentone, SFX art and boxes too
+small to hold a line of text. Manga-OCR is the most expensive local step,
+so every crop is first checked with a few vectorized pixel statistics and
+boxes that cannot hold readable text are skipped before OCR (and so
+before translation and rendering).
+"""
+
+import logging
+import numpy as np
+
+from ocr_batch import grayscale
+from rendering import TEXT_PADDING
+
+logger = logging.getLogger(__name__)
+
+# Default thresholds, override any of them with Manga_Reader(ocr_filter={...})
+OCR_FILTER_THRESHOLDS = {
+    'min_side': TEXT_PADDING * 2 + 1,   # Smaller boxes cannot be rendered into
+    'ink_level': 128,                   # Gray level below which a pixel is ink
+    'min_ink_ratio': 0.002,             # Less ink: blank box
+    'max_ink_ratio': 0.6,               # More ink: dark art or solid SFX...
+    'max_dense_edge_density': 0.01,     # ...unless it has strokes (white-on-black captions)
+    'min_std': 4.0,                     # Flatter: blank area
+    'edge_level': 48,                   # Gradient step counted as an edge
+    'min_edge_density': 0.002,          # Fewer edges: no strokes to read
+}
+
+# Statistics are computed on at most this many pixels per crop (larger
+# crops are subsampled)
+OCR_FILTER_MAX_PIXELS = 65536
+
+SKIP_REASONS = ('too_small', 'blank', 'dense', 'no_edges')
+
+
+def crop_statistics(crop, thresholds=OCR_FILTER_THRESHOLDS):
+    """
+    Compute ink ratio, contrast and edge density of a crop.
+    
+    Args:
+        crop (np.ndarray): (h, w, 3) uint8 crop
+        thresholds (dict): Filter thresholds (ink_level and edge_level are used)
+    
+    Returns:
+        dict: ink_ratio, std and edge_density
+    """
+    step = max(1, int(np.ceil(np.sqrt(crop.shape[0] * crop.shape[1] / OCR_FILTER_MAX_PIXELS))))
+    gray = grayscale(crop[::step, ::step]).astype(np.int16)
+    
+    dx = np.abs(np.diff(gray, axis=1)) >= thresholds['edge_level']
+    dy = np.abs(np.diff(gray, axis=0)) >= thresholds['edge_level']
+    edges = dx.sum() + dy.sum()
+    
+    return {
+        'ink_ratio': float((gray < thresholds['ink_level']).mean()),
+        'std': float(gray.std()),
+        'edge_density': float(edges / max(1, dx.size + dy.size)),
+    }
+
+
+def skip_reason(crop, thresholds=OCR_FILTER_THRESHOLDS):
+    """
+    Decide whether a crop is worth OCR.
+    
+    Args:
+        crop (np.ndarray): (h, w, 3) uint8 crop
+        thresholds (dict): Filter thresholds (see OCR_FILTER_THRESHOLDS)
+    
+    Returns:
+        str: One of SKIP_REASONS, or None if the crop should be OCR'd
+    """
+    height, width = crop.shape[:2]
+    if min(height, width) < thresholds['min_side']:
+        return 'too_small'
+    
+    stats = crop_statistics(crop, thresholds)
+    if (stats['ink_ratio'] > thresholds['max_ink_ratio']
+            and stats['edge_density'] < thresholds['max_dense_edge_density']):
+        return 'dense'
+    if stats['ink_ratio'] < thresholds['min_ink_ratio'] or stats['std'] < thresholds['min_std']:
+        return 'blank'
+    if stats['edge_density'] < thresholds['min_edge_density']:
+        return 'no_edges'
+    return None
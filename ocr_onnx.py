@@ -0,0 +1,250 @@
+"""
+Manga-OCR on ONNX Runtime with int8 weights.
+
+MangaOcr runs the PyTorch VisionEncoderDecoder in fp32. On CPU-only
+machines most of the per-bubble time goes into the decoder matmuls, which
+run several times faster with dynamically quantized int8 weights under
+ONNX Runtime. export_onnx() exports the encoder and the decoder of the
+Manga-OCR model once (torch is only needed for that step), OnnxMangaOcr
+then runs batched greedy decoding with onnxruntime, using only the
+tokenizer and image processor of transformers.
+
+Select it with Manga_Reader(ocr_backend="onnx"); compare it with the
+PyTorch model on the test pages with bench_ocr.py.
+"""
+
+import logging
+import os
+import re
+import unicodedata
+import numpy as np
+
+from ocr_batch import OCR_BATCH_SIZE, bucket_by_size, to_ocr_input
+
+logger = logging.getLogger(__name__)
+
+# Hugging Face model used by MangaOcr
+MANGA_OCR_MODEL = "kha-white/manga-ocr-base"
+
+# Where exported models are written (see export_onnx)
+ONNX_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "manga-ocr-onnx")
+
+# ONNX Runtime intra-op threads per session (None = one per physical core)
+ONNX_NUM_THREADS = None
+
+ONNX_OPSET = 14
+
+# Same limit as MangaOcr's generate() call
+OCR_MAX_LENGTH = 300
+
+# Half-width ASCII -> full-width forms (U+FF01-U+FF5E)
+_FULLWIDTH_ASCII = {code: code + 0xFEE0 for code in range(0x21, 0x7F)}
+
+
+def post_process(text):
+    """
+    Normalize decoded text the way MangaOcr does (manga_ocr.ocr.post_process).
+    
+    Kept here so the ONNX backend does not import manga_ocr, which loads
+    torch; jaconv.h2z is replaced by NFKC on half-width katakana and a
+    full-width ASCII table.
+    """
+    text = ''.join(text.split())
+    text = text.replace('…', '...')
+    text = re.sub('[・.]{2,}', lambda match: (match.end() - match.start()) * '.', text)
+    text = re.sub('[\uff61-\uff9f]+', lambda match: unicodedata.normalize('NFKC', match.group()), text)
+    return text.translate(_FULLWIDTH_ASCII)
+
+
+def onnx_paths(model_dir=ONNX_MODEL_DIR, quantized=True):
+    """
+    Paths of the exported encoder and decoder.
+    
+    Returns:
+        tuple: (encoder path, decoder path)
+    """
+    suffix = ".int8.onnx" if quantized else ".onnx"
+    return os.path.join(model_dir, "encoder" + suffix), os.path.join(model_dir, "decoder" + suffix)
+
+
+def export_onnx(model_name=MANGA_OCR_MODEL, model_dir=ONNX_MODEL_DIR, quantize=True):
+    """
+    Export the Manga-OCR encoder and decoder to ONNX.
+    
+    The decoder is exported without a key/value cache: it takes the
+    tokens generated so far and returns the logits of the next token only.
+    Manga texts are short, so re-running the decoder over the prefix costs
+    little and keeps the graph simple.
+    
+    Args:
+        model_name (str): Hugging Face model to export
+        model_dir (str): Output directory
+        quantize (bool): Also write int8 copies (dynamic quantization of
+            the weights, activations stay fp32)
+    
+    Returns:
+        tuple: (encoder path, decoder path) of the exported models
+    """
+    import torch
+    from transformers import VisionEncoderDecoderModel
+    
+    os.makedirs(model_dir, exist_ok=True)
+    model = VisionEncoderDecoderModel.from_pretrained(model_name).eval()
+    encoder_path, decoder_path = onnx_paths(model_dir, quantized=False)
+    
+    class Encoder(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.encoder = model.encoder
+            self.projection = getattr(model, 'enc_to_dec_proj', None)
+        
+        def forward(self, pixel_values):
+            hidden = self.encoder(pixel_values=pixel_values).last_hidden_state
+            return hidden if self.projection is None else self.projection(hidden)
+    
+    class Decoder(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.decoder = model.decoder
+        
+        def forward(self, input_ids, encoder_hidden_states):
+            output = self.decoder(input_ids=input_ids, encoder_hidden_states=encoder_hidden_states, use_cache=False)
+            return output.logits[:, -1]
+    
+    size = model.config.encoder.image_size
+    pixel_values = torch.zeros(2, 3, size, size)
+    with torch.inference_mode():
+        hidden = Encoder()(pixel_values)
+    input_ids = torch.full((2, 3), model.config.decoder_start_token_id, dtype=torch.long)
+    
+    torch.onnx.export(
+        Encoder(), (pixel_values,), encoder_path, opset_version=ONNX_OPSET,
+        input_names=['pixel_values'], output_names=['encoder_hidden_states'],
+        dynamic_axes={'pixel_values': {0: 'batch'}, 'encoder_hidden_states': {0: 'batch'}},
+    )
+    torch.onnx.export(
+        Decoder(), (input_ids, hidden), decoder_path, opset_version=ONNX_OPSET,
+        input_names=['input_ids', 'encoder_hidden_states'], output_names=['logits'],
+        dynamic_axes={'input_ids': {0: 'batch', 1: 'sequence'},
+                      'encoder_hidden_states': {0: 'batch'}, 'logits': {0: 'batch'}},
+    )
+    logger.info(f"Exported Manga-OCR to {model_dir}")
+    
+    if not quantize:
+        return encoder_path, decoder_path
+    
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    
+    quantized_paths = onnx_paths(model_dir, quantized=True)
+    for source, target in zip((encoder_path, decoder_path), quantized_paths):
+        quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+        logger.info(f"Quantized {os.path.basename(source)}: {os.path.getsize(source) / 1e6:.0f} MB -> "
+                    f"{os.path.getsize(target) / 1e6:.0f} MB")
+    return quantized_paths
+
+
+class OnnxMangaOcr:
+    """
+    Manga-OCR running on ONNX Runtime (CPU).
+    
+    Drop-in for MangaOcr: call it with one crop, or use recognize_batch()
+    for many crops. Crops may be PIL images or (h, w, 3) uint8 arrays.
+    
+    Usage:
+        ocr = OnnxMangaOcr(num_threads=4)
+        text = ocr(Image.open("bubble.png"))
+    """
+    
+    def __init__(self, model_dir=ONNX_MODEL_DIR, quantized=True, num_threads=ONNX_NUM_THREADS,
+                 model_name=MANGA_OCR_MODEL):
+        """
+        Load the exported models, exporting them first if they are missing.
+        
+        Args:
+            model_dir (str): Directory of the exported models
+            quantized (bool): Use the int8 models (False = fp32 export)
+            num_threads (int): ONNX Runtime intra-op threads (None = default)
+            model_name (str): Hugging Face model (tokenizer, preprocessing, export)
+        """
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoImageProcessor, AutoTokenizer
+        
+        encoder_path, decoder_path = onnx_paths(model_dir, quantized)
+        if not (os.path.exists(encoder_path) and os.path.exists(decoder_path)):
+            logger.info(f"ONNX Manga-OCR not found in {model_dir}, exporting it")
+            export_onnx(model_name, model_dir, quantize=quantized)
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.inter_op_num_threads = 1
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        providers = ['CPUExecutionProvider']
+        self.encoder = ort.InferenceSession(encoder_path, options, providers=providers)
+        self.decoder = ort.InferenceSession(decoder_path, options, providers=providers)
+        
+        config = AutoConfig.from_pretrained(model_name)
+        self.processor = AutoImageProcessor.from_pretrained(model_name)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.start_token_id = config.decoder_start_token_id
+        self.eos_token_id = config.eos_token_id if config.eos_token_id is not None else self.tokenizer.sep_token_id
+        self.pad_token_id = config.pad_token_id if config.pad_token_id is not None else self.tokenizer.pad_token_id
+        self.max_length = OCR_MAX_LENGTH
+        
+        logger.info(f"ONNX Manga-OCR loaded ({'int8' if quantized else 'fp32'}, threads={num_threads or 'default'})")
+    
+    def __call__(self, crop):
+        """Recognize the text of one crop."""
+        return self.recognize_batch([crop])[0]
+    
+    def _generate(self, pixel_values):
+        """
+        Greedy decoding of a batch.
+        
+        Finished sequences are dropped from the batch, so the decoder only
+        runs over crops that are still producing tokens.
+        
+        Args:
+            pixel_values (np.ndarray): (n, 3, h, w) float32 encoder input
+        
+        Returns:
+            np.ndarray: (n, length) token ids, padded after the end token
+        """
+        hidden = self.encoder.run(None, {'pixel_values': pixel_values})[0]
+        ids = np.full((len(pixel_values), 1), self.start_token_id, dtype=np.int64)
+        active = np.arange(len(pixel_values))
+        
+        while len(active) and ids.shape[1] < self.max_length:
+            logits = self.decoder.run(None, {'input_ids': ids[active], 'encoder_hidden_states': hidden[active]})[0]
+            next_ids = np.full(len(ids), self.pad_token_id, dtype=np.int64)
+            next_ids[active] = logits.argmax(axis=-1)
+            ids = np.concatenate([ids, next_ids[:, None]], axis=1)
+            active = active[next_ids[active] != self.eos_token_id]
+        
+        return ids
+    
+    def recognize_batch(self, crops, batch_size=OCR_BATCH_SIZE):
+        """
+        Recognize many crops, batch_size crops per encoder/decoder pass.
+        
+        Args:
+            crops (list): Bubble crops (PIL images or arrays)
+            batch_size (int): Maximum crops per batch
+        
+        Returns:
+            list: Recognized texts, in the same order as crops
+        """
+        texts = [None] * len(crops)
+        for batch in bucket_by_size(crops, batch_size):
+            images = [to_ocr_input(crops[idx]) for idx in batch]
+            pixel_values = self.processor(images, return_tensors="np").pixel_values.astype(np.float32)
+            decoded = self.tokenizer.batch_decode(self._generate(pixel_values), skip_special_tokens=True)
+            for idx, text in zip(batch, decoded):
+                texts[idx] = post_process(text)
+            logger.info(f"ONNX OCR batch: {len(batch)} crops")
+        return texts
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    export_onnx()
@@ -0,0 +1,146 @@
+"""
+Decoded page representation.
+
+A Page converts an input image to RGB once (RGBA and palette pages are
+composited onto white) and keeps one NumPy copy of its pixels. Bubble
+crops are array views into that copy, so OCR of a page with many bubbles
+does not allocate a new image per bubble, and the detection cache hashes
+the same buffer instead of serializing the page again.
+"""
+
+import logging
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+class Page:
+    """
+    A manga page normalized to RGB, with zero-copy crops.
+    
+    Usage:
+        page = Page(Image.open("page.png"))
+        crop = page.crop([x1, y1, x2, y2])   # np.ndarray view, no copy
+        stats = page.memory_stats()
+    """
+    
+    def __init__(self, image):
+        """
+        Normalize a page image to RGB.
+        
+        Args:
+            image (PIL.Image): Decoded page, any mode
+        """
+        self.source_mode = image.mode
+        self.image = to_rgb(image)
+        self._array = None
+        self.array_bytes = 0
+        self.crops = 0
+        self.copied_bytes = 0
+    
+    @property
+    def mode(self):
+        return self.image.mode
+    
+    @property
+    def size(self):
+        return self.image.size
+    
+    @property
+    def array(self):
+        """Pixels as an (height, width, 3) uint8 array, created on first use."""
+        if self._array is None:
+            self._array = np.asarray(self.image)
+            self.array_bytes = self._array.nbytes
+        return self._array
+    
+    def tobytes(self):
+        """Raw RGB pixels (same bytes as Image.tobytes, without another copy)."""
+        return memoryview(self.array).cast('B')
+    
+    def _clip(self, box):
+        width, height = self.size
+        x1, y1, x2, y2 = (int(value) for value in box[:4])
+        return max(0, x1), max(0, y1), min(width, x2), min(height, y2)
+    
+    def crop(self, box):
+        """
+        Crop a textbox as a view into the page array (no copy).
+        
+        Args:
+            box (list): [x1, y1, x2, y2], clipped to the page
+        
+        Returns:
+            np.ndarray: (h, w, 3) view of the page pixels
+        """
+        x1, y1, x2, y2 = self._clip(box)
+        self.crops += 1
+        return self.array[y1:max(y1, y2), x1:max(x1, x2)]
+    
+    def crop_image(self, box):
+        """
+        Crop a textbox as a PIL image (copies the crop pixels).
+        
+        For consumers that only accept PIL images.
+        """
+        x1, y1, x2, y2 = self._clip(box)
+        self.crops += 1
+        crop = self.image.crop((x1, y1, max(x1, x2), max(y1, y2)))
+        self.copied_bytes += crop.width * crop.height * 3
+        return crop
+    
+    def release(self):
+        """Drop the pixel array once no crop is needed anymore."""
+        self._array = None
+    
+    def memory_stats(self):
+        """
+        Get memory used for this page.
+        
+        Returns:
+            dict: image_bytes (RGB pixels of the page), array_bytes (pixel
+                array shared by all crops), copied_bytes (pixels copied for
+                crops), crops (number of crops handed out), converted
+                (True if the input was not RGB)
+        """
+        width, height = self.size
+        return {
+            'image_bytes': width * height * 3,
+            'array_bytes': self.array_bytes,
+            'copied_bytes': self.copied_bytes,
+            'crops': self.crops,
+            'converted': self.source_mode != 'RGB',
+        }
+
+
+def to_rgb(image):
+    """
+    Convert an image to RGB, compositing transparent pixels onto white.
+    
+    Args:
+        image (PIL.Image): Image in any mode
+    
+    Returns:
+        PIL.Image: The image itself if it is already RGB, else a converted copy
+    """
+    if image.mode == 'RGB':
+        return image
+    
+    if image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info):
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    
+    return image.convert('RGB')
+
+
+def as_page(image):
+    """Wrap an image in a Page (a Page is returned unchanged)."""
+    return image if isinstance(image, Page) else Page(image)
+
+
+def page_image(frame):
+    """PIL image of a Page or of a plain image."""
+    return frame.image if isinstance(frame, Page) else frame
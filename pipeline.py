@@ -0,0 +1,191 @@
+"""
+Staged concurrent pipeline for processing many pages with one Manga_Reader.
+
+Each stage (detect -> OCR -> translate -> render -> save) runs in its own
+worker threads and hands pages to the next stage through a bounded queue.
+While page N is being OCR'd, page N+1 is already being detected and page
+N-1 translated, so chapter throughput approaches that of the slowest stage
+instead of the sum of all stages. A full queue blocks the stage before it
+(backpressure), which also bounds how many decoded pages are in memory.
+"""
+
+import queue
+import threading
+import time
+import logging
+
+from page import as_page
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_STAGES = ('detect', 'ocr', 'translate', 'render', 'save')
+
+# Worker threads per stage. Detection and translation mostly wait on the
+# network; OCR and rendering are CPU-bound.
+PIPELINE_STAGE_WORKERS = {
+    'detect': 2,
+    'ocr': 1,
+    'translate': 1,
+    'render': 1,
+    'save': 1,
+}
+
+# Pages waiting between two stages
+PIPELINE_QUEUE_SIZE = 4
+
+_STOP = object()
+
+
+class PagePipeline:
+    """
+    Multi-page pipeline with bounded queues between stages.
+    
+    Usage:
+        pipeline = PagePipeline(reader, stage_workers={'detect': 4})
+        translated_pages = pipeline.run(pages)
+    """
+    
+    def __init__(self, reader, stage_workers=None, queue_size=PIPELINE_QUEUE_SIZE, save_fn=None):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            reader (Manga_Reader): Reader used by every stage
+            stage_workers (dict): Worker threads per stage name (overrides defaults)
+            queue_size (int): Max pages waiting between two stages
+            save_fn (callable): Optional save_fn(index, image) run as the last stage
+        """
+        self.reader = reader
+        self.stage_workers = dict(PIPELINE_STAGE_WORKERS)
+        self.stage_workers.update(stage_workers or {})
+        self.queue_size = max(1, queue_size)
+        self.save_fn = save_fn
+        self.stage_times = {stage: 0.0 for stage in PIPELINE_STAGES}
+        self._lock = threading.Lock()
+    
+    def _detect(self, job):
+        # Decode and normalize the page to RGB once for all later stages
+        job['page'] = as_page(job['image'])
+        job['image'] = job['page'].image
+        job['textboxes'] = self.reader.detect(job['page'])
+        self.reader._count('total_textboxes', len(job['textboxes']))
+    
+    def _ocr(self, job):
+        job['recognized'] = self.reader._recognize_textboxes(job.pop('page'), job['textboxes'])
+    
+    def _translate(self, job):
+        job['translations'] = self.reader.translate_batch([text for _, text in job['recognized']])
+    
+    def _render(self, job):
+        job['result'], _ = self.reader._render_translations(
+            job['image'], job['recognized'], job['translations']
+        )
+        self.reader._count('processed_images')
+    
+    def _save(self, job):
+        self.save_fn(job['index'], job['result'])
+    
+    def _worker(self, stage, handler, inbox, outbox, remaining, next_workers):
+        """Process jobs of one stage until every worker of the stage is stopped."""
+        while True:
+            job = inbox.get()
+            if job is _STOP:
+                with self._lock:
+                    remaining[stage] -= 1
+                    last = remaining[stage] == 0
+                if last:
+                    for _ in range(next_workers):
+                        outbox.put(_STOP)
+                return
+            
+            # A page that failed in an earlier stage is passed through unchanged
+            if job['error'] is None:
+                start_time = time.time()
+                try:
+                    handler(job)
+                except Exception as e:
+                    logger.error(f"Pipeline {stage} failed for page {job['index']}: {e}")
+                    job['error'] = e
+                with self._lock:
+                    self.stage_times[stage] += time.time() - start_time
+            
+            outbox.put(job)
+    
+    def _feed(self, images, inbox, workers):
+        """Put input pages into the first queue (blocks while it is full)."""
+        try:
+            for index, image in enumerate(images):
+                self.reader._count('total_images')
+                inbox.put({'index': index, 'image': image, 'result': image, 'error': None})
+        except Exception as e:
+            logger.error(f"Pipeline input error: {e}")
+        finally:
+            for _ in range(workers):
+                inbox.put(_STOP)
+    
+    def run(self, images):
+        """
+        Process pages through the staged pipeline.
+        
+        Args:
+            images (iterable): Input manga page images (PIL.Image). May be a
+                generator, so pages are only loaded when the pipeline has room.
+        
+        Returns:
+            list: Processed images in input order (a page that failed keeps
+                its original image)
+        """
+        handlers = {
+            'detect': self._detect,
+            'ocr': self._ocr,
+            'translate': self._translate,
+            'render': self._render,
+            'save': self._save,
+        }
+        stages = [stage for stage in PIPELINE_STAGES if stage != 'save' or self.save_fn is not None]
+        workers = [max(1, self.stage_workers.get(stage, 1)) for stage in stages]
+        
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in stages]
+        queues.append(queue.Queue())  # results
+        remaining = dict(zip(stages, workers))
+        
+        start_time = time.time()
+        threads = [threading.Thread(target=self._feed, args=(images, queues[0], workers[0]), daemon=True)]
+        for idx, stage in enumerate(stages):
+            next_workers = workers[idx + 1] if idx + 1 < len(stages) else 1
+            for _ in range(workers[idx]):
+                threads.append(threading.Thread(
+                    target=self._worker,
+                    args=(stage, handlers[stage], queues[idx], queues[idx + 1], remaining, next_workers),
+                    name=f"pipeline-{stage}",
+                    daemon=True
+                ))
+        
+        logger.info(f"Starting pipeline: {dict(zip(stages, workers))} workers, queue size {self.queue_size}")
+        for thread in threads:
+            thread.start()
+        
+        results = {}
+        while True:
+            job = queues[-1].get()
+            if job is _STOP:
+                break
+            results[job['index']] = job['result']
+        
+        for thread in threads:
+            thread.join()
+        
+        elapsed_time = time.time() - start_time
+        self.reader._count('total_time', elapsed_time)
+        
+        busiest = max(stages, key=lambda stage: self.stage_times[stage])
+        logger.info(
+            f"Pipeline completed: {len(results)} pages in {elapsed_time:.2f}s "
+            f"(slowest stage: {busiest}, {self.stage_times[busiest]:.2f}s busy)"
+        )
+        return [results[index] for index in sorted(results)]
+    
+    def stats(self):
+        """Get busy time (seconds) per stage."""
+        with self._lock:
+            return dict(self.stage_times)
@@ -1,14 +1,35 @@
-from deep_translator import GoogleTranslator
-from PIL import Image, ImageDraw, ImageFont
-from manga_ocr import MangaOcr
+# Heavy dependencies (manga_ocr/torch, deep_translator, requests, tenacity,
+# asyncio) are imported where they are first used, so importing this module
+# stays cheap for the UI and the CLI (see bench_imports.py).
+from PIL import Image
 from dotenv import load_dotenv
-from tenacity import retry, stop_after_attempt, wait_exponential
 import os
-import requests
+import functools
+import json
 import base64
 from io import BytesIO
+import numpy as np
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote_plus
+from cache import get_translation_cache, get_detection_cache, DetectionCache
+from ocr_batch import OCR_BATCH_SIZE, supports_batching, recognize_batch
+from pipeline import PagePipeline, PIPELINE_QUEUE_SIZE
+from boxes import postprocess_boxes
+from page import as_page, page_image
+from ocr_filter import OCR_FILTER_THRESHOLDS, SKIP_REASONS, skip_reason
+from model_loader import LazyModel, start_warmup, get_shared_model
+from backends import available_backends, create_backend, load_backend_config
+from ocr_onnx import ONNX_NUM_THREADS
+from tiling import (
+    should_tile, tile_spans, merge_tile_boxes, TILE_ASPECT, TILE_OVERLAP, TILE_OVERLAP_SLACK, TILE_WORKERS,
+)
+from rendering import (
+    font_cache_stats, wrap_text, fit_text, layout_text, render_layouts,
+    MAX_FONT_SIZE, MIN_FONT_SIZE, TEXT_PADDING, CLEAR_MODE, CLEAR_MODES
+)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -33,59 +54,270 @@ SUPPORTED_LANGUAGES = {
     'ru': 'Russian',
 }
 
+# Roboflow HTTP client: one keep-alive session per reader
+ROBOFLOW_API_BASE = "https://detect.roboflow.com"
+HTTP_POOL_SIZE = 4          # Max pooled connections to the detection API
+HTTP_CONNECT_TIMEOUT = 5    # Seconds to establish a connection
+HTTP_READ_TIMEOUT = 30      # Seconds to wait for the detection response
+
+# Detection input: pages are downscaled and re-encoded before upload
+DETECTION_MAX_SIDE = 1280       # Longest side sent to the detector (pixels)
+DETECTION_IMAGE_FORMAT = "JPEG"  # JPEG, PNG or WEBP
+DETECTION_IMAGE_QUALITY = 85    # JPEG/WEBP quality
+DETECTION_UPLOAD_MODE = "multipart"  # "multipart" (raw bytes) or "base64"
+
+# Local YOLO: pages per forward pass in detect_batch
+YOLO_BATCH_SIZE = 8
+
+# Retry policy for detection and translation requests (tenacity, see retry_policy)
+RETRY_ATTEMPTS = 3
+RETRY_WAIT = dict(multiplier=1, min=2, max=10)
+
+# asyncio API: max concurrent detection/translation requests, and worker
+# threads for the CPU stages (OCR, rendering)
+ASYNC_MAX_IN_FLIGHT = 16
+ASYNC_CPU_WORKERS = 2
+
+# Source language of the manga text (Manga-OCR recognizes Japanese)
+SOURCE_LANGUAGE = 'ja'
+
+# Default backends (see backends.py for the registry and offline stand-ins)
+OCR_BACKEND = 'torch'
+TRANSLATOR_BACKEND = 'google'
+
+# Batched translation: texts are joined with this separator into one request.
+# Requests are sent as URL parameters, so batches are measured in URL-encoded
+# bytes (a Japanese character takes 9): 6000 bytes is ~660 Japanese
+# characters, well below Google's 5000-character and URL length limits.
+TRANSLATION_BATCH_SEPARATOR = "\n"
+TRANSLATION_BATCH_MAX_URL_BYTES = 6000
+
+
+def retry_policy():
+    """Tenacity arguments of the retry policy (tenacity is imported on demand)."""
+    from tenacity import stop_after_attempt, wait_exponential
+    return dict(stop=stop_after_attempt(RETRY_ATTEMPTS), wait=wait_exponential(**RETRY_WAIT), reraise=True)
+
+
+def retried(func):
+    """Decorator: call func with the retry policy."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        from tenacity import Retrying
+        for attempt in Retrying(**retry_policy()):
+            with attempt:
+                return func(*args, **kwargs)
+    return wrapper
+
+
+def create_http_session(pool_size=HTTP_POOL_SIZE):
+    """
+    Create a keep-alive HTTP session with a bounded connection pool.
+    
+    Retries are left to tenacity, so the adapter itself never retries.
+    
+    Args:
+        pool_size (int): Max connections kept open per host
+    
+    Returns:
+        requests.Session: Session reusing TCP/TLS connections between requests
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+def prepare_detection_input(frame, max_side=DETECTION_MAX_SIDE, image_format=DETECTION_IMAGE_FORMAT,
+                            quality=DETECTION_IMAGE_QUALITY):
+    """
+    Downscale and encode a page for upload to the detection API.
+    
+    The original frame is not modified, so OCR crops still come from the
+    full-resolution page.
+    
+    Args:
+        frame (PIL.Image): Full-resolution page
+        max_side (int): Longest side of the uploaded image (None = no resize)
+        image_format (str): Encoding format (JPEG, PNG or WEBP)
+        quality (int): JPEG/WEBP quality
+    
+    Returns:
+        tuple: (encoded bytes, scale_x, scale_y) where scale maps coordinates
+            of the uploaded image back to the original frame
+    """
+    if frame.mode not in ('RGB', 'L'):
+        frame = frame.convert('RGB')
+    
+    width, height = frame.size
+    if max_side and max(width, height) > max_side:
+        ratio = max_side / max(width, height)
+        new_size = (max(1, round(width * ratio)), max(1, round(height * ratio)))
+        frame = frame.resize(new_size, Image.BILINEAR, reducing_gap=2.0)
+    
+    buffered = BytesIO()
+    if image_format.upper() in ('JPEG', 'WEBP'):
+        frame.save(buffered, format=image_format, quality=quality)
+    else:
+        frame.save(buffered, format=image_format)
+    
+    return buffered.getvalue(), width / frame.size[0], height / frame.size[1]
+
 class Manga_Reader:
-    def __init__(self, detector=None, use_roboflow=True, target_language='vi'):
+    def __init__(self, detector=None, use_roboflow=True, target_language='vi', use_cache=True,
+                 http_pool_size=HTTP_POOL_SIZE, connect_timeout=HTTP_CONNECT_TIMEOUT,
+                 read_timeout=HTTP_READ_TIMEOUT, detection_max_side=DETECTION_MAX_SIDE,
+                 detection_format=DETECTION_IMAGE_FORMAT, detection_quality=DETECTION_IMAGE_QUALITY,
+                 upload_mode=DETECTION_UPLOAD_MODE, yolo_batch_size=YOLO_BATCH_SIZE,
+                 ocr_batch_size=OCR_BATCH_SIZE, async_max_in_flight=ASYNC_MAX_IN_FLIGHT,
+                 clear_mode=CLEAR_MODE, tile_tall_pages=True, ocr_filter=OCR_FILTER_THRESHOLDS,
+                 warm_up=True, share_models=True, ocr_backend=OCR_BACKEND, onnx_threads=ONNX_NUM_THREADS,
+                 detector_backend=None, translator_backend=TRANSLATOR_BACKEND, backend_options=None):
         """
         Initialize Manga Reader.
         
         Args:
-            detector: Path to local YOLO model (if use_roboflow=False)
+            detector: Path to local YOLO model (if use_roboflow=False); .onnx exports run without ultralytics
             use_roboflow: If True, use Roboflow API for detection
             target_language: Target language code (default: 'vi' for Vietnamese)
+            use_cache: If True, use the shared on-disk translation and detection caches
+            http_pool_size: Max pooled keep-alive connections to the Roboflow API
+            connect_timeout: Seconds to establish a connection to the Roboflow API
+            read_timeout: Seconds to wait for a Roboflow response
+            detection_max_side: Longest side of the page sent to Roboflow (None = full size)
+            detection_format: Upload encoding (JPEG, PNG or WEBP)
+            detection_quality: JPEG/WEBP upload quality
+            upload_mode: "multipart" (raw binary) or "base64" (form body)
+            yolo_batch_size: Pages per local YOLO forward pass in detect_batch
+            ocr_batch_size: Bubble crops per Manga-OCR forward pass (1 = no batching)
+            async_max_in_flight: Max concurrent detection/translation requests in the asyncio API
+            clear_mode: "rectangle" (blank whole textboxes) or "bubble" (only bright bubble interiors)
+            tile_tall_pages: If True, detect very tall pages (webtoon strips) in overlapping tiles
+            ocr_filter: Thresholds overriding OCR_FILTER_THRESHOLDS to skip blank, tiny or
+                solid boxes before OCR (None = OCR every box)
+            warm_up: If True, start loading the models in a background thread. Models are
+                otherwise loaded on first use.
+            share_models: If True, use the process-wide Manga-OCR and YOLO models, so readers
+                for other target languages do not load another copy of the weights
+            ocr_backend: "torch" (MangaOcr, fp32 PyTorch), "onnx" (int8 ONNX Runtime, see ocr_onnx.py)
+                or "fixture" (offline stand-in)
+            onnx_threads: ONNX Runtime threads of the "onnx" OCR backend (None = one per core)
+            detector_backend: Detection backend name (default: "roboflow" if use_roboflow, else "yolo")
+            translator_backend: "google", or the offline "echo" and "dictionary" stand-ins
+            backend_options: Options per stage, e.g. {'detector': {'api_base': url, 'api_key': key},
+                'translator': {'path': 'dictionary.json'}} (see backends.py)
         """
-        self.use_roboflow = use_roboflow
+        if clear_mode not in CLEAR_MODES:
+            raise ValueError(f"Unknown clear mode: {clear_mode} (expected one of {CLEAR_MODES})")
+        if detector_backend is None:
+            detector_backend = 'roboflow' if use_roboflow else 'yolo'
+        for stage, name in (('detector', detector_backend), ('ocr', ocr_backend), ('translator', translator_backend)):
+            if name not in available_backends(stage):
+                raise ValueError(f"Unknown {stage} backend: {name} (expected one of {available_backends(stage)})")
+        backend_options = {stage: dict(options) for stage, options in (backend_options or {}).items()}
+        
+        self.use_roboflow = detector_backend == 'roboflow'
+        self.detector_backend = detector_backend
+        self.clear_mode = clear_mode
+        self.tile_tall_pages = tile_tall_pages
+        self.ocr_filter = None if ocr_filter is None else {**OCR_FILTER_THRESHOLDS, **ocr_filter}
         self.target_language = target_language
-        self.processing_stats = {
-            'total_images': 0,
-            'processed_images': 0,
-            'total_textboxes': 0,
-            'total_time': 0
-        }
+        self.yolo_batch_size = max(1, yolo_batch_size)
+        self.ocr_batch_size = max(1, ocr_batch_size)
+        self.processing_stats = self._new_stats()
+        self._stats_lock = threading.Lock()
+        self.last_error = None  # Message of the last error the pipeline recovered from
+        # deep_translator keeps per-request state on the translator object, so
+        # every thread gets its own translator instead of sharing one
+        self._translators = threading.local()
+        self._translator_factory = None
+        self._translator_generation = 0
+        
+        # asyncio API state, created on first use
+        self.async_max_in_flight = max(1, async_max_in_flight)
+        self._async_loop = None
+        self._async_semaphore = None
+        self._io_executor = None
+        self._cpu_executor = None
+        
+        # Heavy models, loaded on first use (or by the warm-up thread)
+        self.share_models = share_models
+        self.ocr_backend = ocr_backend
+        ocr_options = backend_options.get('ocr', {})
+        if ocr_backend == 'onnx':
+            ocr_options.setdefault('num_threads', onnx_threads)
+        ocr_key = f"{ocr_backend}:{json.dumps(ocr_options, sort_keys=True, default=str)}"
+        self._models = {'ocr': self._lazy_model('ocr', ocr_key, lambda: create_backend('ocr', ocr_backend, **ocr_options))}
+        self._warmup_thread = None
         
+        detector_options = backend_options.get('detector', {})
         try:
-            if use_roboflow:
+            if self.use_roboflow:
                 # Roboflow API setup - su dung model manga-bubble-pqdou
-                self.api_key = os.getenv("ROBOFLOW_API_KEY", "")
+                self.api_key = detector_options.get('api_key') or os.getenv("ROBOFLOW_API_KEY", "")
                 if not self.api_key:
                     raise ValueError("ROBOFLOW_API_KEY not found. Please set it in .env file")
-                self.model_id = "manga-bubble-pqdou/1"
-                self.api_url = f"https://detect.roboflow.com/{self.model_id}"
+                self.model_id = detector_options.get('model_id', "manga-bubble-pqdou/1")
+                api_base = (detector_options.get('api_base') or os.getenv("ROBOFLOW_API_BASE", ROBOFLOW_API_BASE)).rstrip("/")
+                self.api_url = f"{api_base}/{self.model_id}"
+                self.timeout = (connect_timeout, read_timeout)
+                self.detection_max_side = detection_max_side
+                self.detection_format = detection_format.upper()
+                self.detection_quality = detection_quality
+                self.upload_mode = upload_mode
+                self.session = create_http_session(http_pool_size)
+                self.confidence = 40
+                self.detector_id = (
+                    f"roboflow:{self.api_url}:{detection_max_side}:{self.detection_format}:{detection_quality}"
+                )
                 logger.info(f"Initialized Roboflow detection with model: {self.model_id}")
             else:
-                # Local YOLO model
-                if detector is None:
-                    detector = "yolov8_manga.pt"
-                from ultralytics import YOLO
-                self.model = YOLO(detector)
-                logger.info(f"Initialized local YOLO model: {detector}")
+                # Local model (YOLO weights or another registered detector)
+                self.confidence = None  # model default
+                if detector_backend == 'yolo':
+                    weights = detector_options.get('weights') or detector or "yolov8_manga.pt"
+                    detector_options['weights'] = weights
+                    weights_mtime = os.path.getmtime(weights) if os.path.exists(weights) else 0
+                    self.detector_id = f"yolo:{os.path.abspath(weights)}:{weights_mtime}"
+                else:
+                    self.detector_id = f"{detector_backend}:{json.dumps(detector_options, sort_keys=True, default=str)}"
+                self._models['detector'] = self._lazy_model(
+                    'detector', self.detector_id, lambda: create_backend('detector', detector_backend, **detector_options)
+                )
+                logger.info(f"Using local detector {self.detector_id} (loaded on first use)")
         except Exception as e:
             logger.error(f"Error initializing detection model: {e}")
             raise
         
+        self.translator_backend = translator_backend
+        self._translator_options = backend_options.get('translator', {})
         try:
-            self.recognizer = MangaOcr()        # Manga-OCR
-            logger.info("Manga-OCR initialized successfully")
-        except Exception as e:
-            logger.error(f"Error initializing Manga-OCR: {e}")
-            raise
-        
-        try:
-            self.translator = GoogleTranslator(source='ja', target=target_language)
-            logger.info(f"Google Translator initialized for ja → {target_language} ({SUPPORTED_LANGUAGES.get(target_language, 'Unknown')})")
+            self._use_translator(lambda: self._create_translator(target_language))
+            logger.info(f"Translator '{translator_backend}' initialized for ja → {target_language} "
+                        f"({SUPPORTED_LANGUAGES.get(target_language, 'Unknown')})")
         except Exception as e:
             logger.error(f"Error initializing translator: {e}")
             raise
         
+        self.translation_batch_max_bytes = TRANSLATION_BATCH_MAX_URL_BYTES
+        
+        # Translation and detection caches - shared by every reader in the process
+        self.translation_cache = None
+        self.detection_cache = None
+        if use_cache:
+            try:
+                self.translation_cache = get_translation_cache()
+            except Exception as e:
+                logger.warning(f"Translation cache unavailable, continuing without it: {e}")
+            try:
+                self.detection_cache = get_detection_cache()
+            except Exception as e:
+                logger.warning(f"Detection cache unavailable, continuing without it: {e}")
+        
         # Font path - su dung duong dan tuyet doi
         self.font_path = os.path.join(os.path.dirname(__file__), "font", "arial.ttf")
         
@@ -94,6 +326,135 @@ class Manga_Reader:
             logger.warning(f"Font file not found at {self.font_path}")
         else:
             logger.info(f"Font file loaded: {self.font_path}")
+        
+        if warm_up:
+            self._warmup_thread = start_warmup(self._models)
+    
+    @classmethod
+    def from_config(cls, config, **kwargs):
+        """
+        Create a reader with the backends named in a config.
+        
+        Example (offline, with standins.RoboflowStandIn listening on port 9001):
+            {"detector": {"name": "roboflow", "api_base": "http://127.0.0.1:9001", "api_key": "offline"},
+             "ocr": "fixture", "translator": "dictionary", "reader": {"use_cache": false}}
+        
+        Args:
+            config: Mapping or path to a JSON file (see backends.load_backend_config)
+            **kwargs: Other Manga_Reader arguments (override the config "reader" entry)
+        
+        Returns:
+            Manga_Reader: The configured reader
+        """
+        stages, reader_kwargs = load_backend_config(config)
+        reader_kwargs.update(kwargs)
+        backend_options = {stage: dict(options) for stage, options in (reader_kwargs.get('backend_options') or {}).items()}
+        for stage, (name, options) in stages.items():
+            reader_kwargs[f"{stage}_backend"] = name
+            backend_options.setdefault(stage, {}).update(options)
+        reader_kwargs['backend_options'] = backend_options
+        return cls(**reader_kwargs)
+    
+    def _create_translator(self, language_code):
+        """Build a translator of the configured backend for a target language."""
+        return create_backend('translator', self.translator_backend, target_language=language_code,
+                              source=SOURCE_LANGUAGE, **self._translator_options)
+    
+    def _use_translator(self, factory):
+        """
+        Switch every thread to translators built by factory.
+        
+        One translator is built right away in the calling thread, so
+        configuration errors surface here; other threads build theirs on
+        first use.
+        """
+        translator = factory()
+        self._translator_factory = factory
+        self._translator_generation += 1
+        self._translators.translator = translator
+        self._translators.generation = self._translator_generation
+    
+    @property
+    def translator(self):
+        """Translator of the calling thread (built on first use in each thread)."""
+        local = self._translators
+        if getattr(local, 'generation', None) != self._translator_generation:
+            local.translator = self._translator_factory()
+            local.generation = self._translator_generation
+        return local.translator
+    
+    @translator.setter
+    def translator(self, translator):
+        """Use one translator object in every thread (it must be thread-safe)."""
+        self._use_translator(lambda: translator)
+    
+    @property
+    def _cache_language(self):
+        """Target language key in the translation cache (offline translators get their own namespace)."""
+        if self.translator_backend == TRANSLATOR_BACKEND:
+            return self.target_language
+        return f"{self.translator_backend}:{self.target_language}"
+    
+    def _lazy_model(self, name, key, loader):
+        """Shared or reader-private LazyModel, depending on share_models."""
+        if self.share_models:
+            return get_shared_model(name, key, loader)
+        return LazyModel(name, loader)
+    
+    def _replace_model(self, name, value):
+        """Use another model in this reader only (shared models are left untouched)."""
+        model = LazyModel(name, None)
+        model.set(value)
+        self._models[name] = model
+    
+    @property
+    def recognizer(self):
+        """Manga-OCR instance (loaded on first access)."""
+        return self._models['ocr'].get()
+    
+    @recognizer.setter
+    def recognizer(self, value):
+        self._replace_model('ocr', value)
+    
+    @property
+    def model(self):
+        """Local YOLO model (loaded on first access)."""
+        if 'detector' not in self._models:
+            raise AttributeError("Roboflow readers have no local detection model")
+        return self._models['detector'].get()
+    
+    @model.setter
+    def model(self, value):
+        self._replace_model('detector', value)
+    
+    def wait_until_ready(self, timeout=None):
+        """
+        Block until the warm-up thread has loaded every model.
+        
+        Args:
+            timeout: Max seconds to wait (None = no limit)
+        
+        Returns:
+            bool: True if every model is loaded
+        """
+        if self._warmup_thread is not None:
+            self._warmup_thread.join(timeout)
+        return all(model.loaded for model in self._models.values())
+    
+    def model_timings(self):
+        """Loading times per model (see LazyModel.timings)."""
+        return {name: model.timings() for name, model in self._models.items()}
+    
+    def close(self):
+        """Close the pooled HTTP connections and async worker threads of this reader."""
+        session = getattr(self, 'session', None)
+        if session is not None:
+            session.close()
+        for executor in (self._io_executor, self._cpu_executor):
+            if executor is not None:
+                executor.shutdown(wait=False)
+        self._io_executor = None
+        self._cpu_executor = None
     
     def set_target_language(self, language_code):
         """Change target language for translation."""
@@ -102,66 +463,356 @@ class Manga_Reader:
                 logger.warning(f"Language {language_code} not supported. Using Vietnamese instead.")
                 language_code = 'vi'
             
+            self._use_translator(lambda: self._create_translator(language_code))
             self.target_language = language_code
-            self.translator = GoogleTranslator(source='ja', target=language_code)
             logger.info(f"Changed target language to {language_code} ({SUPPORTED_LANGUAGES.get(language_code)})")
             return True
         except Exception as e:
             logger.error(f"Error changing language: {e}")
             return False
     
-    def get_stats(self):
-        """Get processing statistics."""
-        return self.processing_stats.copy()
-    
-    def reset_stats(self):
-        """Reset processing statistics."""
-        self.processing_stats = {
+    @staticmethod
+    def _new_stats():
+        """Return a fresh processing statistics dictionary."""
+        return {
             'total_images': 0,
             'processed_images': 0,
             'total_textboxes': 0,
-            'total_time': 0
+            'total_time': 0,
+            'translation_requests': 0,
+            'translation_cache_hits': 0,
+            'translation_cache_misses': 0,
+            'detection_cache_hits': 0,
+            'detection_cache_misses': 0,
+            'detection_time_saved': 0,
+            'upload_bytes': 0,
+            'detection_tiles': 0,
+            'boxes_filtered': 0,
+            'page_bytes': 0,
+            'crop_bytes_copied': 0,
+            'ocr_skipped': 0,
+            **{f'ocr_skipped_{reason}': 0 for reason in SKIP_REASONS},
+            'errors': 0,
         }
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        reraise=True
-    )
+    def _record_error(self, message):
+        """Log an error the pipeline recovers from, counted in the 'errors' statistic."""
+        logger.error(message)
+        self.last_error = message
+        self._count('errors')
+    
+    def _count(self, key, value=1):
+        """Add value to a processing statistic (thread-safe)."""
+        with self._stats_lock:
+            self.processing_stats[key] += value
+    
+    def get_stats(self):
+        """Get processing statistics (font cache counters are process-wide)."""
+        with self._stats_lock:
+            stats = self.processing_stats.copy()
+        stats.update(font_cache_stats())
+        return stats
+    
+    def reset_stats(self):
+        """Reset processing statistics."""
+        with self._stats_lock:
+            self.processing_stats = self._new_stats()
+    
+    def clear_translation_cache(self, language_code=None):
+        """
+        Invalidate cached translations.
+        
+        Args:
+            language_code (str): Only clear translations into this language,
+                made by any translator backend. If None, the whole cache is
+                cleared.
+        
+        Returns:
+            int: Number of deleted entries
+        """
+        if self.translation_cache is None:
+            return 0
+        if language_code is None:
+            return self.translation_cache.invalidate()
+        # Offline translators cache under "<backend>:<language>" (see _cache_language)
+        return sum(
+            self.translation_cache.invalidate(
+                target_lang=language_code if name == TRANSLATOR_BACKEND else f"{name}:{language_code}"
+            )
+            for name in available_backends('translator')
+        )
+    
+    def _lookup_detection(self, frame):
+        """
+        Look up a page in the detection cache.
+        
+        Args:
+            frame (PIL.Image): Page image
+        
+        Returns:
+            tuple: (cache key, cached textboxes or None). The key is None
+                when the cache is disabled or failed.
+        """
+        if self.detection_cache is None:
+            return None, None
+        
+        try:
+            cache_key = DetectionCache.make_key(frame, self._detection_id(frame), self.confidence)
+            cached = self.detection_cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Detection cache lookup failed: {e}")
+            return None, None
+        
+        if cached is None:
+            self._count('detection_cache_misses')
+            return cache_key, None
+        
+        textboxes, detection_time = cached
+        self._count('detection_cache_hits')
+        self._count('detection_time_saved', detection_time)
+        logger.info(f"Detection cache hit: {len(textboxes)} textboxes, saved {detection_time:.2f}s")
+        return cache_key, textboxes
+    
+    def _store_detection(self, cache_key, textboxes, detection_time):
+        """Store detected textboxes of a page in the detection cache."""
+        if cache_key is None:
+            return
+        
+        try:
+            self.detection_cache.set(cache_key, textboxes, detection_time)
+        except Exception as e:
+            logger.warning(f"Detection cache write failed: {e}")
+    
     def detect(self, frame):
+        """
+        Detects textboxes in a frame, using the detection cache when possible.
+        
+        Pages are looked up by a hash of their pixels plus the detector
+        identity and confidence threshold, so a page that has already been
+        processed skips detection completely.
+        
+        Parameters:
+            frame: the input frame to detect textboxes (PIL Image or Page).
+        
+        Returns:
+            A list of textboxes where each box is represented as [x1, y1, x2, y2].
+        """
+        cache_key, cached = self._lookup_detection(frame)
+        if cached is not None:
+            return cached
+        
+        start_time = time.time()
+        if self._is_tiled(frame):
+            textboxes = self._detect_tiled(page_image(frame))
+        else:
+            textboxes = self._detect_uncached(page_image(frame))
+        self._store_detection(cache_key, textboxes, time.time() - start_time)
+        
+        return textboxes
+    
+    def detect_batch(self, frames):
+        """
+        Detects textboxes in several frames.
+        
+        With the local YOLO model, uncached frames are run through the model
+        in batches of yolo_batch_size pages per forward pass. With Roboflow,
+        frames are detected one request at a time. Very tall frames are
+        detected in tiles.
+        
+        Parameters:
+            frames: the input frames (list of PIL Images or Pages).
+        
+        Returns:
+            A list with one textbox list per frame, in the same order as the input.
+        """
+        results = [None] * len(frames)
+        pending = []  # (frame index, cache key)
+        
+        for idx, frame in enumerate(frames):
+            cache_key, cached = self._lookup_detection(frame)
+            if cached is not None:
+                results[idx] = cached
+            elif self._is_tiled(frame):
+                start_time = time.time()
+                results[idx] = self._detect_tiled(page_image(frame))
+                self._store_detection(cache_key, results[idx], time.time() - start_time)
+            else:
+                pending.append((idx, cache_key))
+        
+        if self.use_roboflow:
+            for idx, cache_key in pending:
+                start_time = time.time()
+                results[idx] = self._detect_uncached(page_image(frames[idx]))
+                self._store_detection(cache_key, results[idx], time.time() - start_time)
+            return results
+        
+        for start in range(0, len(pending), self.yolo_batch_size):
+            batch = pending[start:start + self.yolo_batch_size]
+            start_time = time.time()
+            batch_textboxes = self._detect_yolo([page_image(frames[idx]) for idx, _ in batch])
+            per_frame_time = (time.time() - start_time) / len(batch)
+            
+            for (idx, cache_key), textboxes in zip(batch, batch_textboxes):
+                results[idx] = textboxes
+                self._store_detection(cache_key, textboxes, per_frame_time)
+        
+        return results
+    
+    def _is_tiled(self, frame):
+        """Return True if frame is detected in tiles."""
+        return self.tile_tall_pages and should_tile(frame.size)
+    
+    def _detection_id(self, frame):
+        """Detector identity used in the detection cache key of frame."""
+        if self._is_tiled(frame):
+            return f"{self.detector_id}:tiles:{TILE_ASPECT}:{TILE_OVERLAP}:{TILE_OVERLAP_SLACK}"
+        return self.detector_id
+    
+    @staticmethod
+    def _crop_tile(frame, span):
+        """Crop the full-width tile (top, bottom) of a page."""
+        top, bottom = span
+        return frame.crop((0, top, frame.width, bottom))
+    
+    def _detect_tile(self, frame, span):
+        """Crop one tile and detect it (no retry, no cache)."""
+        return self._detect_once(self._crop_tile(frame, span))
+    
+    def _detect_tiled(self, frame):
+        """
+        Detect a very tall page in overlapping tiles.
+        
+        Tiles are cropped by the worker that detects them, so only the tiles
+        in flight exist as separate images. Roboflow tiles are sent
+        concurrently; YOLO tiles go through the model yolo_batch_size at a time.
+        
+        Args:
+            frame (PIL.Image): Page image
+        
+        Returns:
+            list: [x1, y1, x2, y2] textboxes in page coordinates
+        """
+        spans = tile_spans(frame.size)
+        self._count('detection_tiles', len(spans))
+        logger.info(f"Tiled detection: {frame.width}x{frame.height} page in {len(spans)} tiles")
+        
+        if self.use_roboflow:
+            detect_tile = retried(self._detect_tile)
+            with ThreadPoolExecutor(min(TILE_WORKERS, len(spans)), thread_name_prefix="detect-tile") as executor:
+                tile_boxes = list(executor.map(lambda span: detect_tile(frame, span), spans))
+        else:
+            tile_boxes = []
+            for start in range(0, len(spans), self.yolo_batch_size):
+                tiles = [self._crop_tile(frame, span) for span in spans[start:start + self.yolo_batch_size]]
+                tile_boxes.extend(self._detect_yolo(tiles))
+        
+        return merge_tile_boxes(spans, tile_boxes)
+    
+    def _postprocess_boxes(self, raw_boxes, size, scores=None):
+        """
+        Clip detector boxes to the page and merge duplicates before OCR.
+        
+        Args:
+            raw_boxes (list): [x1, y1, x2, y2] boxes from the detector
+            size (tuple): Page (width, height)
+            scores (list): Detector confidence per box, if available
+        
+        Returns:
+            list: Integer [x1, y1, x2, y2] textboxes
+        """
+        textboxes = postprocess_boxes(raw_boxes, size, scores)
+        removed = len(raw_boxes) - len(textboxes)
+        if removed:
+            self._count('boxes_filtered', removed)
+            logger.info(f"Box post-processing: removed {removed}/{len(raw_boxes)} boxes")
+        return textboxes
+    
+    def _detect_yolo(self, frames):
+        """
+        Run the local YOLO model over several frames in one forward pass.
+        
+        Args:
+            frames (list): Page images (PIL.Image)
+        
+        Returns:
+            list: One list of [x1, y1, x2, y2] textboxes per frame
+        """
+        model = self.model
+        if callable(getattr(model, 'detect', None)):
+            # ONNX detector: thread-safe, returns page boxes and scores as arrays
+            detections = model.detect(list(frames))
+        else:
+            # ultralytics models are not thread-safe: calls are serialized on the
+            # LazyModel, shared by every reader holding the same weights
+            with self._models['detector'].call_lock:
+                results = model(list(frames), verbose=False)
+            detections = []
+            for result in results:
+                raw_boxes = [[float(value) for value in b.xyxy[0]] for b in result.boxes]
+                scores = [float(b.conf[0]) for b in result.boxes] if all(
+                    hasattr(b, 'conf') for b in result.boxes) else None
+                detections.append((raw_boxes, scores))
+        
+        batch_textboxes = []
+        for frame, (raw_boxes, scores) in zip(frames, detections):
+            batch_textboxes.append(self._postprocess_boxes(raw_boxes, frame.size, scores))
+        
+        logger.info(f"YOLO batch detection: {len(frames)} frames, "
+                    f"{sum(len(boxes) for boxes in batch_textboxes)} textboxes")
+        return batch_textboxes
+    
+    @retried
+    def _detect_uncached(self, frame):
+        """Detect textboxes without the cache (retried on failure)."""
+        return self._detect_once(frame)
+    
+    def _detect_once(self, frame):
         """
         Detects textboxes in a frame using the YOLO model. 
-
+        
         Parameters:
             frame: the input frame to detect textboxes (PIL Image).
-
+        
         Returns:
             A list of textboxes where each box is represented as [x1, y1, x2, y2].
         """
         textboxes = []
+        # requests is only imported on the Roboflow path (except () catches nothing)
+        request_error = ()
         
         try:
             if self.use_roboflow:
-                # Roboflow REST API - convert image to base64
-                # Convert RGBA to RGB if needed
-                if frame.mode == 'RGBA':
-                    frame = frame.convert('RGB')
+                import requests
+                request_error = requests.exceptions.RequestException
+                
+                # Roboflow REST API - send a downscaled copy of the page
+                payload, scale_x, scale_y = prepare_detection_input(
+                    frame, self.detection_max_side, self.detection_format, self.detection_quality
+                )
+                self._count('upload_bytes', len(payload))
                 
-                buffered = BytesIO()
-                frame.save(buffered, format="JPEG")
-                img_base64 = base64.b64encode(buffered.getvalue()).decode("utf-8")
+                if self.upload_mode == 'base64':
+                    request_kwargs = {
+                        "data": base64.b64encode(payload).decode("utf-8"),
+                        "headers": {"Content-Type": "application/x-www-form-urlencoded"}
+                    }
+                else:
+                    # Raw binary multipart upload, no +33% base64 overhead
+                    mime_type = f"image/{self.detection_format.lower()}"
+                    request_kwargs = {"files": {"file": ("page", payload, mime_type)}}
                 
                 # Call Roboflow API
-                response = requests.post(
+                response = self.session.post(
                     self.api_url,
-                    params={"api_key": self.api_key, "confidence": 40},
-                    data=img_base64,
-                    headers={"Content-Type": "application/x-www-form-urlencoded"},
-                    timeout=30
+                    params={"api_key": self.api_key, "confidence": self.confidence},
+                    timeout=self.timeout,
+                    **request_kwargs
                 )
                 response.raise_for_status()
                 results = response.json()
                 
+                raw_boxes = []
+                scores = []
                 for prediction in results.get("predictions", []):
                     try:
                         x_center = prediction["x"]
@@ -169,28 +820,26 @@ class Manga_Reader:
                         width = prediction["width"]
                         height = prediction["height"]
                         
-                        x1 = int(x_center - width / 2)
-                        y1 = int(y_center - height / 2)
-                        x2 = int(x_center + width / 2)
-                        y2 = int(y_center + height / 2)
-                        textboxes.append([x1, y1, x2, y2])
+                        # Map back from the uploaded image to full resolution
+                        raw_boxes.append([
+                            (x_center - width / 2) * scale_x,
+                            (y_center - height / 2) * scale_y,
+                            (x_center + width / 2) * scale_x,
+                            (y_center + height / 2) * scale_y,
+                        ])
+                        scores.append(prediction.get("confidence", 0))
                     except KeyError as e:
                         logger.warning(f"Missing key in prediction: {e}")
                         continue
                 
+                textboxes = self._postprocess_boxes(raw_boxes, frame.size, scores)
                 logger.info(f"Detection: Found {len(textboxes)} textboxes")
             else:
                 # Local YOLO model
-                from ultralytics import YOLO
-                results = self.model(frame)
-                box = results[0].boxes
-                for b in box:
-                    x1, y1, x2, y2 = b.xyxy[0]
-                    x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-                    textboxes.append([x1, y1, x2, y2])
+                textboxes = self._detect_yolo([frame])[0]
                 
                 logger.info(f"Detection: Found {len(textboxes)} textboxes")
-        except requests.exceptions.RequestException as e:
+        except request_error as e:
             logger.error(f"Roboflow API error: {e}")
             raise
         except Exception as e:
@@ -199,231 +848,494 @@ class Manga_Reader:
         
         return textboxes
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        reraise=True
-    )
-    def translate_text(self, text):
+    @retried
+    def _translate_request(self, text):
+        """Send a single request to the translation backend (retried on failure)."""
+        return self._translate_once(text)
+    
+    def _translate_once(self, text):
+        """Send a single request to the translation backend."""
+        self._count('translation_requests')
+        return self.translator.translate(text)
+    
+    def _cached_translations(self, texts):
         """
-        Translate Japanese text to Vietnamese with retry mechanism.
+        Look up texts in the translation cache.
         
         Args:
-            text (str): Japanese text to translate
-            
+            texts (list): Unique source texts
+        
         Returns:
-            str: Translated Vietnamese text
+            dict: source text -> translation for the cache hits
         """
+        if self.translation_cache is None or not texts:
+            return {}
+        
         try:
-            if not text or not text.strip():
-                return text
-            
-            translated = self.translator.translate(text)
+            found = self.translation_cache.get_many(texts, SOURCE_LANGUAGE, self._cache_language)
+        except Exception as e:
+            logger.warning(f"Translation cache lookup failed: {e}")
+            return {}
+        
+        self._count('translation_cache_hits', len(found))
+        self._count('translation_cache_misses', len(texts) - len(found))
+        return found
+    
+    def _store_translations(self, translations):
+        """Store successful translations (source text -> translation) in the cache."""
+        if self.translation_cache is None or not translations:
+            return
+        
+        try:
+            self.translation_cache.set_many(translations, SOURCE_LANGUAGE, self._cache_language)
+        except Exception as e:
+            logger.warning(f"Translation cache write failed: {e}")
+    
+    def _translate_uncached(self, text):
+        """Translate a single text with the backend and cache the result."""
+        try:
+            translated = self._translate_request(text)
+            self._store_translations({text: translated})
             logger.info(f"Translation: '{text[:30]}...' -> '{translated[:30]}...'")
             return translated
         except Exception as e:
-            logger.error(f"Translation error: {e}")
+            self._record_error(f"Translation error: {e}")
             # Return original text if translation fails
             return text
     
-    def wrap_text(self, text, font, max_width):
+    def translate_text(self, text):
         """
-        Wrap text to fit within max_width.
+        Translate Japanese text to Vietnamese with retry mechanism.
+        
+        Translations are looked up in the shared cache first.
         
         Args:
-            text (str): Text to wrap
-            font: PIL font object
-            max_width (int): Maximum width in pixels
-            
+            text (str): Japanese text to translate
+        
         Returns:
-            list: List of wrapped lines
+            str: Translated Vietnamese text
         """
-        words = text.split()
-        lines = []
-        current_line = ""
-        
-        for word in words:
-            test_line = current_line + word + " " if current_line else word + " "
-            bbox = font.getbbox(test_line)
-            line_width = bbox[2] - bbox[0]
-            
-            if line_width <= max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line.strip())
-                current_line = word + " "
+        if not text or not text.strip():
+            return text
         
-        if current_line:
-            lines.append(current_line.strip())
+        cached = self._cached_translations([text])
+        if text in cached:
+            return cached[text]
         
-        return lines
+        return self._translate_uncached(text)
     
-    def calculate_font_size(self, text, box_width, box_height, max_font_size=40):
+    def _build_translation_chunks(self, texts):
         """
-        Calculate appropriate font size for text to fit in textbox.
+        Group text indices into chunks that fit in one translation request.
+        
+        Chunk sizes are counted as the URL-encoded query they become.
         
         Args:
-            text (str): Text to render
-            box_width (int): Width of textbox
-            box_height (int): Height of textbox
-            max_font_size (int): Maximum font size to try
-            
+            texts (list): Texts to translate
+        
         Returns:
-            int: Appropriate font size
+            list: List of index lists, one per request
         """
-        try:
-            font_size = max_font_size
-            padding = 10  # Padding từ edge của textbox
-            max_width = box_width - (padding * 2)
-            max_height = box_height - (padding * 2)
+        chunks = []
+        current = []
+        current_size = 0
+        
+        for idx, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
             
-            while font_size > 8:
-                try:
-                    font = ImageFont.truetype(self.font_path, font_size)
-                    lines = self.wrap_text(text, font, max_width)
-                    
-                    # Tính tổng height của tất cả lines
-                    bbox = font.getbbox("A")
-                    line_height = bbox[3] - bbox[1]
-                    total_height = len(lines) * (line_height + 3)  # 3px spacing
-                    
-                    if total_height <= max_height:
-                        return font_size
-                except Exception as e:
-                    logger.warning(f"Error in font size calculation: {e}")
-                    font_size -= 1
-                    continue
-                
-                font_size -= 1
+            size = len(quote_plus(text + TRANSLATION_BATCH_SEPARATOR))
+            if current and current_size + size > self.translation_batch_max_bytes:
+                chunks.append(current)
+                current = []
+                current_size = 0
             
-            return 8
-        except Exception as e:
-            logger.warning(f"Error calculating font size: {e}, using default 16")
-            return 16
-
-    def process_chat(self, text, posText, img):
+            current.append(idx)
+            current_size += size
+        
+        if current:
+            chunks.append(current)
+        
+        return chunks
+    
+    def _prepare_translation(self, texts):
         """
-        Process the chat text and add it to the image.
+        Resolve cached and repeated texts and plan the translation requests.
+        
+        Args:
+            texts (list): Japanese texts
         
-        Features:
-        - Dynamic font sizing
-        - Text wrapping to fit textbox width
-        - Clear original Japanese text with white background
-        - Center-aligned text rendering
-        - Graceful overflow handling
-
-        Parameters:
-            text (str): The text to be processed (Japanese).
-            posText (tuple): The position of the textbox as [x1, y1, x2, y2].
-            img (PIL.Image.Image): The image to add the processed text to.
-
         Returns:
-            PIL.Image.Image: The image with the processed text added.
+            tuple: (cleaned texts, dict of known translations, list of chunks
+                where each chunk is a list of texts for one request)
         """
-        try:
-            if not text or not text.strip():
-                logger.warning("Empty text received, skipping processing")
-                return img
-            
-            # Translate text to Vietnamese
-            translated_text = self.translate_text(text)
-            
-            # Get textbox dimensions
-            x1, y1, x2, y2 = posText
-            box_width = x2 - x1
-            box_height = y2 - y1
-            padding = 10
-            
-            # Validate dimensions
-            if box_width <= padding * 2 or box_height <= padding * 2:
-                logger.warning(f"Textbox too small: {box_width}x{box_height}")
-                return img
-            
-            # Step 1: Clear original text area with white background
-            try:
-                draw = ImageDraw.Draw(img)
-                draw.rectangle([x1, y1, x2, y2], fill="white", outline=None)
-                logger.info(f"Cleared textbox area: ({x1}, {y1}) to ({x2}, {y2})")
-            except Exception as e:
-                logger.warning(f"Error clearing text area: {e}")
-            
-            # Step 2: Calculate appropriate font size
-            font_size = self.calculate_font_size(translated_text, box_width, box_height)
+        # Newlines inside a text would break the mapping back to boxes
+        cleaned = [
+            " ".join(text.split(TRANSLATION_BATCH_SEPARATOR)) if text else text
+            for text in texts
+        ]
+        
+        unique = list(dict.fromkeys(text for text in cleaned if text and text.strip()))
+        translated = self._cached_translations(unique)
+        pending = [text for text in unique if text not in translated]
+        
+        chunks = [[pending[idx] for idx in chunk] for chunk in self._build_translation_chunks(pending)]
+        logger.info(
+            f"Batch translation: {len(texts)} texts, {len(unique) - len(pending)} cached, "
+            f"{len(pending)} sent in {len(chunks)} request(s)"
+        )
+        return cleaned, translated, chunks
+    
+    def _split_chunk_translation(self, chunk_texts, result):
+        """
+        Map the translation of a joined chunk back to its texts.
+        
+        Args:
+            chunk_texts (list): Texts that were joined into one request
+            result (str): Translated joined text
+        
+        Returns:
+            dict: source text -> translation, or None if the line count does not match
+        """
+        parts = result.split(TRANSLATION_BATCH_SEPARATOR)
+        if len(parts) != len(chunk_texts):
+            logger.warning(
+                f"Batch translation returned {len(parts)} lines for {len(chunk_texts)} texts, "
+                "falling back to per-text translation"
+            )
+            return None
+        
+        chunk_translations = {text: part.strip() for text, part in zip(chunk_texts, parts)}
+        self._store_translations(chunk_translations)
+        return chunk_translations
+    
+    def translate_batch(self, texts):
+        """
+        Translate many texts with as few backend requests as possible.
+        
+        Cached and repeated texts are resolved first. The remaining unique
+        texts are joined with a line separator into chunks that stay under
+        the backend size limit, and each translated chunk is split back and
+        mapped to its original position. If a chunk comes back with a
+        different number of lines, its texts are translated one by one.
+        
+        Args:
+            texts (list): Japanese texts (e.g. all OCR results of a page or chapter)
+        
+        Returns:
+            list: Translated texts in the same order as the input
+        """
+        cleaned, translated, chunks = self._prepare_translation(texts)
+        
+        for chunk_texts in chunks:
+            if len(chunk_texts) == 1:
+                translated[chunk_texts[0]] = self._translate_uncached(chunk_texts[0])
+                continue
             
-            # Step 3: Load font
             try:
-                font = ImageFont.truetype(self.font_path, font_size)
-                logger.info(f"Using font size: {font_size}pt")
+                joined = TRANSLATION_BATCH_SEPARATOR.join(chunk_texts)
+                chunk_translations = self._split_chunk_translation(chunk_texts, self._translate_request(joined))
+                if chunk_translations is not None:
+                    translated.update(chunk_translations)
+                    continue
             except Exception as e:
-                logger.warning(f"Error loading font: {e}, using default font")
-                font = ImageFont.load_default()
+                logger.error(f"Batch translation error: {e}, falling back to per-text translation")
             
-            # Step 4: Wrap text to fit width
+            for text in chunk_texts:
+                translated[text] = self._translate_uncached(text)
+        
+        return [translated.get(text, text) for text in cleaned]
+    
+    def wrap_text(self, text, font, max_width):
+        """
+        Wrap text to fit within max_width.
+        
+        Args:
+            text (str): Text to wrap
+            font: PIL font object
+            max_width (int): Maximum width in pixels
+        
+        Returns:
+            list: List of wrapped lines
+        """
+        return wrap_text(text, font, max_width)
+    
+    def fit_text(self, text, box_width, box_height, max_font_size=MAX_FONT_SIZE):
+        """
+        Find the font size for text in a textbox, with the wrapped lines.
+        
+        Args:
+            text (str): Text to render
+            box_width (int): Width of textbox
+            box_height (int): Height of textbox
+            max_font_size (int): Maximum font size to try
+        
+        Returns:
+            tuple: (font size, wrapped lines)
+        """
+        return fit_text(text, self.font_path, box_width, box_height, max_font_size)
+    
+    def calculate_font_size(self, text, box_width, box_height, max_font_size=MAX_FONT_SIZE):
+        """
+        Calculate appropriate font size for text to fit in textbox.
+        
+        Args:
+            text (str): Text to render
+            box_width (int): Width of textbox
+            box_height (int): Height of textbox
+            max_font_size (int): Maximum font size to try
+        
+        Returns:
+            int: Appropriate font size
+        """
+        try:
+            font_size, _ = self.fit_text(text, box_width, box_height, max_font_size)
+            return font_size
+        except Exception as e:
+            logger.warning(f"Error calculating font size: {e}, using minimum {MIN_FONT_SIZE}")
+            return MIN_FONT_SIZE
+    
+    def layout_text(self, text, box_width, box_height):
+        """
+        Compute where a text goes inside a textbox, without drawing it.
+        
+        Falls back to PIL's default font if the TrueType font cannot be used.
+        
+        Args:
+            text (str): Translated text
+            box_width (int): Width of textbox
+            box_height (int): Height of textbox
+        
+        Returns:
+            TextLayout: Memoized layout (font size, lines, line positions)
+        """
+        try:
+            return layout_text(text, self.font_path, box_width, box_height)
+        except Exception as e:
+            logger.warning(f"Error laying out text: {e}, using default font")
+            return layout_text(text, None, box_width, box_height)
+    
+    def _layout_textbox(self, text, posText, translated_text=None):
+        """
+        Translate the text of a textbox if needed and compute its layout.
+        
+        Returns:
+            TextLayout: Layout, or None if the textbox is skipped
+        """
+        if not text or not text.strip():
+            logger.warning("Empty text received, skipping processing")
+            return None
+        
+        # Translate text to Vietnamese
+        if translated_text is None:
+            translated_text = self.translate_text(text)
+        
+        # Get textbox dimensions
+        x1, y1, x2, y2 = posText
+        box_width = x2 - x1
+        box_height = y2 - y1
+        
+        # Validate dimensions
+        if box_width <= TEXT_PADDING * 2 or box_height <= TEXT_PADDING * 2:
+            logger.warning(f"Textbox too small: {box_width}x{box_height}")
+            return None
+        
+        layout = self.layout_text(translated_text, box_width, box_height)
+        logger.info(f"Textbox ({x1}, {y1}): {layout.font_size}pt, {len(layout.lines)} lines")
+        return layout
+    
+    def process_chat(self, text, posText, img, translated_text=None):
+        """
+        Process the chat text and add it to the image.
+        
+        Features:
+        - Dynamic font sizing
+        - Text wrapping to fit textbox width
+        - Clear original Japanese text with white background
+        - Center-aligned text rendering
+        - Graceful overflow handling
+        
+        Parameters:
+            text (str): The text to be processed (Japanese).
+            posText (tuple): The position of the textbox as [x1, y1, x2, y2].
+            img (PIL.Image.Image): The image to add the processed text to.
+            translated_text (str): Already translated text (e.g. from
+                translate_batch). If None, the text is translated here.
+        
+        Returns:
+            PIL.Image.Image: The image with the processed text added.
+        """
+        try:
+            layout = self._layout_textbox(text, posText, translated_text)
+            if layout is not None:
+                img = render_layouts(img, [(posText, layout)], clear_mode=self.clear_mode)
+        except Exception as e:
+            logger.error(f"Fatal error in process_chat: {e}")
+            # Return original image if processing fails
+        
+        return img
+    
+    def recognize_batch(self, crops):
+        """
+        OCR many bubble crops.
+        
+        With Manga-OCR, crops are grouped by size and decoded in batches of
+        ocr_batch_size per forward pass. Other recognizers, or a failing
+        batch, fall back to one crop at a time.
+        
+        Args:
+            crops (list): Bubble crops (PIL images or array views of a Page)
+        
+        Returns:
+            list: Recognized text per crop (None where OCR failed)
+        """
+        if self.ocr_batch_size > 1 and len(crops) > 1 and supports_batching(self.recognizer):
             try:
-                max_width = box_width - (padding * 2)
-                lines = self.wrap_text(translated_text, font, max_width)
-                logger.info(f"Text wrapped into {len(lines)} lines")
+                return recognize_batch(self.recognizer, crops, self.ocr_batch_size)
             except Exception as e:
-                logger.error(f"Error wrapping text: {e}")
-                lines = [translated_text]
-            
-            # Step 5: Calculate text positioning (vertical centering)
+                logger.error(f"Batched OCR failed: {e}, falling back to one crop at a time")
+        
+        texts = []
+        for idx, crop in enumerate(crops):
             try:
-                bbox = font.getbbox("A")
-                line_height = bbox[3] - bbox[1] + 3  # 3px spacing
-                total_text_height = len(lines) * line_height
-                
-                # Center text vertically
-                available_height = box_height - (padding * 2)
-                start_y = y1 + padding + (available_height - total_text_height) // 2
-                
-                logger.info(f"Total text height: {total_text_height}px, positioning from y={start_y}")
+                if isinstance(crop, np.ndarray):
+                    crop = Image.fromarray(crop)
+                texts.append(self.recognizer(crop))
             except Exception as e:
-                logger.warning(f"Error calculating text positioning: {e}")
-                start_y = y1 + padding
-                line_height = font_size + 5
-            
-            # Step 6: Render text lines
+                self._record_error(f"OCR error for textbox {idx}: {e}")
+                texts.append(None)
+        return texts
+    
+    def _recognize_pages(self, pages):
+        """
+        Crop and OCR every textbox of several pages in one batched OCR stage.
+        
+        With batched Manga-OCR, crops are array views into each decoded page
+        (no copy per bubble); other recognizers get PIL crops. Boxes rejected
+        by the OCR filter (blank, tiny or solid) are skipped.
+        
+        Args:
+            pages (list): (image or Page, textboxes) pairs
+        
+        Returns:
+            list: Per page, (textbox, text) pairs for the textboxes that were recognized
+        """
+        use_views = self.ocr_batch_size > 1 and supports_batching(self.recognizer)
+        crops = []
+        owners = []  # (page index, textbox) per crop
+        decoded = []
+        for page_idx, (img, textboxes) in enumerate(pages):
+            page = as_page(img)
+            decoded.append(page)
+            for idx, textbox in enumerate(textboxes):
+                try:
+                    if self._skip_ocr(page, textbox):
+                        continue
+                    crops.append(page.crop(textbox) if use_views else page.crop_image(textbox))
+                    owners.append((page_idx, textbox))
+                except Exception as e:
+                    logger.error(f"Error cropping textbox {idx}: {e}")
+        
+        texts = self.recognize_batch(crops)
+        del crops
+        
+        for page in decoded:
+            memory = page.memory_stats()
+            page.release()
+            self._count('page_bytes', memory['array_bytes'] or memory['image_bytes'])
+            self._count('crop_bytes_copied', memory['copied_bytes'])
+            logger.info(f"Page memory: {(memory['array_bytes'] or memory['image_bytes']) / 1e6:.1f} MB decoded, "
+                        f"{memory['copied_bytes'] / 1e3:.1f} KB copied for {memory['crops']} crops")
+        
+        recognized = [[] for _ in pages]
+        for (page_idx, textbox), text in zip(owners, texts):
+            if text is None:
+                continue
+            logger.info(f"OCR result: {text[:50]}...")
+            recognized[page_idx].append((textbox, text))
+        
+        return recognized
+    
+    def _skip_ocr(self, page, textbox):
+        """
+        Check a textbox with the OCR filter and count it if skipped.
+        
+        Args:
+            page (Page): Decoded page
+            textbox (list): [x1, y1, x2, y2]
+        
+        Returns:
+            bool: True if the box holds no readable text
+        """
+        if self.ocr_filter is None:
+            return False
+        try:
+            reason = skip_reason(page.crop(textbox), self.ocr_filter)
+        except Exception as e:
+            logger.warning(f"OCR filter failed, keeping textbox {textbox}: {e}")
+            return False
+        if reason is None:
+            return False
+        self._count('ocr_skipped')
+        self._count(f'ocr_skipped_{reason}')
+        logger.info(f"Skipped OCR of textbox {textbox}: {reason}")
+        return True
+    
+    def _recognize_textboxes(self, img, textboxes):
+        """
+        Crop and OCR every textbox of a page.
+        
+        Args:
+            img (PIL.Image or Page): Input manga page image
+            textboxes (list): Textboxes as [x1, y1, x2, y2]
+        
+        Returns:
+            list: (textbox, text) pairs for the textboxes that were recognized
+        """
+        return self._recognize_pages([(img, textboxes)])[0]
+    
+    def _render_translations(self, img, recognized, translations):
+        """
+        Render translated texts onto a page.
+        
+        Args:
+            img (PIL.Image): Page image
+            recognized (list): (textbox, text) pairs from _recognize_textboxes
+            translations (list): Translated texts, aligned with recognized
+        
+        Returns:
+            tuple: (image, number of textboxes rendered)
+        """
+        # Layout stage: measurement only, memoized per (text, box size, font)
+        placements = []
+        for idx, ((textbox, text), translated) in enumerate(zip(recognized, translations)):
             try:
-                draw = ImageDraw.Draw(img)
-                rendered_lines = 0
-                
-                for i, line in enumerate(lines):
-                    y_pos = start_y + i * line_height
-                    
-                    # Check if line fits within textbox
-                    if y_pos + font_size > y2 - padding:
-                        logger.warning(f"Text overflow: Line {i+1} exceeds textbox height")
-                        break
-                    
-                    # Center text horizontally
-                    bbox = font.getbbox(line)
-                    line_width = bbox[2] - bbox[0]
-                    x_pos = x1 + padding + (max_width - line_width) // 2
-                    
-                    # Draw line
-                    draw.text((x_pos, y_pos), line, fill=(0, 0, 0), font=font)
-                    rendered_lines += 1
-                
-                logger.info(f"Successfully rendered {rendered_lines}/{len(lines)} lines of translated text")
-                
+                layout = self._layout_textbox(text, textbox, translated_text=translated)
+                if layout is not None:
+                    placements.append((textbox, layout))
             except Exception as e:
-                logger.error(f"Error drawing text: {e}")
+                self._record_error(f"Error processing chat {idx}: {e}")
+                continue
         
+        # Render stage: every textbox is cleared, then all text drawn in one Draw pass
+        try:
+            img = render_layouts(img, placements, clear_mode=self.clear_mode)
         except Exception as e:
-            logger.error(f"Fatal error in process_chat: {e}")
-            # Return original image if processing fails
+            self._record_error(f"Error drawing text: {e}")
+            return img, 0
         
-        return img
+        processed_count = len(placements)
+        return img, processed_count
     
     def __call__(self, img):
         """
         Main pipeline: detect -> OCR -> translate -> render
         
+        All textboxes of the page are translated together with translate_batch.
+        
         Args:
-            img (PIL.Image): Input manga page image
-            
+            img (PIL.Image): Input manga page image (any mode, rendered as RGB)
+        
         Returns:
             PIL.Image: Processed image with translations
         """
@@ -431,66 +1343,311 @@ class Manga_Reader:
         
         try:
             logger.info("Starting manga processing pipeline")
-            self.processing_stats['total_images'] += 1
+            self._count('total_images')
+            
+            # Decode and normalize to RGB once for detection, OCR and rendering
+            page = as_page(img)
+            img = page.image
             
             # Detection
             try:
-                textboxes = self.detect(img)
+                textboxes = self.detect(page)
             except Exception as e:
-                logger.error(f"Detection failed: {e}")
+                self._record_error(f"Detection failed: {e}")
                 return img
             
             if not textboxes:
                 logger.info("No textboxes detected")
                 return img
             
-            self.processing_stats['total_textboxes'] += len(textboxes)
+            self._count('total_textboxes', len(textboxes))
             
-            # Process each textbox
-            processed_count = 0
-            for idx, textbox in enumerate(textboxes):
+            # OCR every textbox, then translate the whole page at once
+            recognized = self._recognize_textboxes(page, textboxes)
+            translations = self.translate_batch([text for _, text in recognized])
+            
+            # Render
+            img, processed_count = self._render_translations(img, recognized, translations)
+            
+            elapsed_time = time.time() - start_time
+            self._count('processed_images')
+            self._count('total_time', elapsed_time)
+            
+            logger.info(f"Pipeline completed: {processed_count}/{len(textboxes)} textboxes processed in {elapsed_time:.2f}s")
+            return img
+        
+        except Exception as e:
+            self._record_error(f"Fatal error in pipeline: {e}")
+            return img
+    
+    def process_chapter(self, images):
+        """
+        Process several pages (e.g. a whole chapter) together.
+        
+        Pages are detected with detect_batch and all their textboxes are
+        OCR'd in one batched stage, then all texts of the chapter are
+        translated with a single translate_batch call before rendering.
+        
+        Args:
+            images (list): Input manga page images (PIL.Image)
+        
+        Returns:
+            list: Processed images, in the same order as the input
+        """
+        start_time = time.time()
+        logger.info(f"Starting chapter processing: {len(images)} pages")
+        
+        images = [as_page(img) for img in images]
+        results = [page.image for page in images]
+        detected = []  # (page index, page, textboxes)
+        
+        # Batched detection (one YOLO forward pass per batch of pages)
+        try:
+            all_textboxes = self.detect_batch(images)
+        except Exception as e:
+            logger.error(f"Batch detection failed: {e}, detecting pages one by one")
+            all_textboxes = [None] * len(images)
+        
+        for page_idx, img in enumerate(images):
+            self._count('total_images')
+            textboxes = all_textboxes[page_idx]
+            if textboxes is None:
                 try:
-                    logger.info(f"Processing textbox {idx+1}/{len(textboxes)}")
-                    
-                    # Crop image
-                    try:
-                        bubble_chat = img.crop((textbox[0], textbox[1], textbox[2], textbox[3]))
-                    except Exception as e:
-                        logger.error(f"Error cropping textbox {idx}: {e}")
-                        continue
-                    
-                    # OCR
-                    try:
-                        text = self.recognizer(bubble_chat)
-                        logger.info(f"OCR result: {text[:50]}...")
-                    except Exception as e:
-                        logger.error(f"OCR error for textbox {idx}: {e}")
-                        continue
-                    
-                    # Process and render
-                    try:
-                        img = self.process_chat(text, textbox, img)
-                        processed_count += 1
-                    except Exception as e:
-                        logger.error(f"Error processing chat {idx}: {e}")
-                        continue
-                
+                    textboxes = self.detect(img)
                 except Exception as e:
-                    logger.error(f"Unexpected error processing textbox {idx}: {e}")
+                    self._record_error(f"Detection failed for page {page_idx}: {e}")
+                    continue
+            
+            self._count('total_textboxes', len(textboxes))
+            detected.append((page_idx, img, textboxes))
+        
+        # One OCR stage for the whole chapter
+        recognized_pages = self._recognize_pages([(img, textboxes) for _, img, textboxes in detected])
+        pages = [(page_idx, recognized) for (page_idx, _, _), recognized in zip(detected, recognized_pages)]
+        
+        # One translation stage for the whole chapter
+        all_texts = [text for _, recognized in pages for _, text in recognized]
+        all_translations = self.translate_batch(all_texts)
+        
+        offset = 0
+        for page_idx, recognized in pages:
+            translations = all_translations[offset:offset + len(recognized)]
+            offset += len(recognized)
+            try:
+                results[page_idx], _ = self._render_translations(results[page_idx], recognized, translations)
+                self._count('processed_images')
+            except Exception as e:
+                self._record_error(f"Rendering failed for page {page_idx}: {e}")
+        
+        elapsed_time = time.time() - start_time
+        self._count('total_time', elapsed_time)
+        logger.info(f"Chapter completed: {len(images)} pages in {elapsed_time:.2f}s")
+        return results
+    
+    
+    def process_pipeline(self, images, stage_workers=None, queue_size=PIPELINE_QUEUE_SIZE, save_fn=None):
+        """
+        Process many pages with the staged concurrent pipeline.
+        
+        Detection, OCR, translation, rendering and saving run in separate
+        worker threads connected by bounded queues, so the stages of
+        consecutive pages overlap. See pipeline.PagePipeline.
+        
+        Args:
+            images (iterable): Input manga page images (PIL.Image)
+            stage_workers (dict): Worker threads per stage, e.g. {'detect': 4}
+            queue_size (int): Max pages waiting between two stages
+            save_fn (callable): Optional save_fn(index, image) run as the last stage
+        
+        Returns:
+            list: Processed images, in the same order as the input
+        """
+        pipeline = PagePipeline(self, stage_workers=stage_workers, queue_size=queue_size, save_fn=save_fn)
+        return pipeline.run(images)
+    
+    
+    # ------------------------------------------------------------------
+    # asyncio API
+    # ------------------------------------------------------------------
+    
+    def _async_state(self):
+        """
+        Return the in-flight semaphore and executors for the running event loop.
+        
+        Blocking detection/translation calls run in an I/O thread pool bounded
+        by async_max_in_flight; OCR and rendering run in a small CPU pool.
+        """
+        import asyncio
+        
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_loop = loop
+            self._async_semaphore = asyncio.BoundedSemaphore(self.async_max_in_flight)
+        if self._io_executor is None:
+            self._io_executor = ThreadPoolExecutor(self.async_max_in_flight, thread_name_prefix="reader-io")
+        if self._cpu_executor is None:
+            self._cpu_executor = ThreadPoolExecutor(ASYNC_CPU_WORKERS, thread_name_prefix="reader-cpu")
+        return loop, self._async_semaphore
+    
+    async def _run_io(self, func, *args):
+        """Run a blocking request with the retry policy, without blocking the event loop."""
+        from tenacity import AsyncRetrying
+        
+        loop, semaphore = self._async_state()
+        # AsyncRetrying waits with asyncio.sleep instead of time.sleep
+        async for attempt in AsyncRetrying(**retry_policy()):
+            with attempt:
+                async with semaphore:
+                    return await loop.run_in_executor(self._io_executor, func, *args)
+    
+    async def _run_cpu(self, func, *args):
+        """Run a CPU-bound stage in the CPU executor."""
+        loop, _ = self._async_state()
+        return await loop.run_in_executor(self._cpu_executor, func, *args)
+    
+    async def _run_cache(self, func, *args):
+        """Run a (SQLite) cache read or write in the I/O executor, without retries or an in-flight slot."""
+        loop, _ = self._async_state()
+        return await loop.run_in_executor(self._io_executor, func, *args)
+    
+    async def adetect(self, frame):
+        """
+        Async version of detect().
+        
+        Parameters:
+            frame: the input frame to detect textboxes (PIL Image).
+        
+        Returns:
+            A list of textboxes where each box is represented as [x1, y1, x2, y2].
+        """
+        import asyncio
+        
+        # Hashing the page for the cache key is CPU work
+        cache_key, cached = await self._run_cpu(self._lookup_detection, frame)
+        if cached is not None:
+            return cached
+        
+        start_time = time.time()
+        if self._is_tiled(frame):
+            spans = tile_spans(frame.size)
+            self._count('detection_tiles', len(spans))
+            tile_boxes = await asyncio.gather(*(
+                self._run_io(self._detect_tile, page_image(frame), span) for span in spans
+            ))
+            textboxes = merge_tile_boxes(spans, tile_boxes)
+        else:
+            textboxes = await self._run_io(self._detect_once, page_image(frame))
+        await self._run_cache(self._store_detection, cache_key, textboxes, time.time() - start_time)
+        return textboxes
+    
+    async def _atranslate_uncached(self, text):
+        """Async version of _translate_uncached()."""
+        try:
+            translated = await self._run_io(self._translate_once, text)
+            await self._run_cache(self._store_translations, {text: translated})
+            return translated
+        except Exception as e:
+            self._record_error(f"Translation error: {e}")
+            return text
+    
+    async def atranslate_batch(self, texts):
+        """
+        Async version of translate_batch().
+        
+        Args:
+            texts (list): Japanese texts
+        
+        Returns:
+            list: Translated texts in the same order as the input
+        """
+        # Cache lookups and writes run in the executor, off the event loop
+        cleaned, translated, chunks = await self._run_cache(self._prepare_translation, texts)
+        
+        for chunk_texts in chunks:
+            if len(chunk_texts) == 1:
+                translated[chunk_texts[0]] = await self._atranslate_uncached(chunk_texts[0])
+                continue
+            
+            try:
+                joined = TRANSLATION_BATCH_SEPARATOR.join(chunk_texts)
+                result = await self._run_io(self._translate_once, joined)
+                chunk_translations = await self._run_cache(self._split_chunk_translation, chunk_texts, result)
+                if chunk_translations is not None:
+                    translated.update(chunk_translations)
                     continue
+            except Exception as e:
+                logger.error(f"Batch translation error: {e}, falling back to per-text translation")
+            
+            for text in chunk_texts:
+                translated[text] = await self._atranslate_uncached(text)
+        
+        return [translated.get(text, text) for text in cleaned]
+    
+    async def process(self, img):
+        """
+        Async pipeline: detect -> OCR -> translate -> render
+        
+        Detection and translation requests do not block the event loop, and
+        OCR and rendering run in a worker thread.
+        
+        Args:
+            img (PIL.Image): Input manga page image
+        
+        Returns:
+            PIL.Image: Processed image with translations
+        """
+        start_time = time.time()
+        self._count('total_images')
+        
+        try:
+            page = await self._run_cpu(as_page, img)
+            img = page.image
+            
+            try:
+                textboxes = await self.adetect(page)
+            except Exception as e:
+                self._record_error(f"Detection failed: {e}")
+                return img
+            
+            if not textboxes:
+                logger.info("No textboxes detected")
+                return img
+            
+            self._count('total_textboxes', len(textboxes))
+            
+            recognized = await self._run_cpu(self._recognize_textboxes, page, textboxes)
+            translations = await self.atranslate_batch([text for _, text in recognized])
+            img, processed_count = await self._run_cpu(self._render_translations, img, recognized, translations)
             
             elapsed_time = time.time() - start_time
-            self.processing_stats['processed_images'] += 1
-            self.processing_stats['total_time'] += elapsed_time
+            self._count('processed_images')
+            self._count('total_time', elapsed_time)
             
-            logger.info(f"Pipeline completed: {processed_count}/{len(textboxes)} textboxes processed in {elapsed_time:.2f}s")
+            logger.info(f"Async pipeline completed: {processed_count}/{len(textboxes)} textboxes processed in {elapsed_time:.2f}s")
             return img
         
         except Exception as e:
-            logger.error(f"Fatal error in pipeline: {e}")
+            self._record_error(f"Fatal error in async pipeline: {e}")
             return img
-
     
+    async def process_many(self, images):
+        """
+        Process many pages concurrently.
+        
+        Every page is a coroutine, not a thread: in-flight requests are
+        bounded by async_max_in_flight and the CPU stages by the CPU pool.
+        
+        Args:
+            images (list): Input manga page images (PIL.Image)
+        
+        Returns:
+            list: Processed images, in the same order as the input
+        """
+        import asyncio
+        
+        return await asyncio.gather(*(self.process(img) for img in images))
+
+
 if __name__=='__main__':    
     try:
         reader = Manga_Reader()
@@ -0,0 +1,271 @@
+"""
+Offline stand-ins for the detection, OCR and translation backends.
+
+Fast and deterministic replacements that let the whole pipeline run,
+be benchmarked and be load-tested without API keys, network or model
+weights:
+
+- RoboflowStandIn: local HTTP server answering like the Roboflow detect
+  API (multipart or base64 uploads, same JSON response format)
+- FixtureOcr: returns fixture texts picked from the crop pixels
+- EchoTranslator / DictionaryTranslator: return the text unchanged, or
+  look every line up in a dictionary
+
+They are registered in backends.py as the "fixture" OCR and the "echo"
+and "dictionary" translators. Point the Roboflow detector at the stand-in
+with the api_base detector option (or ROBOFLOW_API_BASE).
+
+Run the server: python standins.py --port 9001
+"""
+
+import base64
+import json
+import logging
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Bubbles predicted by the stand-in detector: a grid of (columns, rows) boxes
+STANDIN_GRID = (2, 3)
+
+# Texts returned by FixtureOcr when a crop has no fixture of its own
+FIXTURE_TEXTS = ("なんだと!?", "行くぞ", "大丈夫か?", "ありがとう", "待って!")
+
+# Translations of FIXTURE_TEXTS used by DictionaryTranslator by default
+FIXTURE_DICTIONARY = {
+    'vi': {"なんだと!?": "Cái gì cơ!?", "行くぞ": "Đi thôi", "大丈夫か?": "Cậu ổn chứ?",
+           "ありがとう": "Cảm ơn", "待って!": "Đợi đã!"},
+    'en': {"なんだと!?": "What!?", "行くぞ": "Let's go", "大丈夫か?": "Are you okay?",
+           "ありがとう": "Thank you", "待って!": "Wait!"},
+}
+
+
+def grid_predictions(size, grid=STANDIN_GRID):
+    """
+    Deterministic Roboflow-style predictions for an image size.
+    
+    Args:
+        size (tuple): Uploaded image (width, height)
+        grid (tuple): (columns, rows) of predicted bubbles
+    
+    Returns:
+        list: Prediction dicts (x, y, width, height are box center and size)
+    """
+    width, height = size
+    columns, rows = grid
+    cell_width, cell_height = width / columns, height / rows
+    predictions = []
+    for row in range(rows):
+        for column in range(columns):
+            predictions.append({
+                "x": round((column + 0.5) * cell_width, 1),
+                "y": round((row + 0.5) * cell_height, 1),
+                "width": round(cell_width * 0.6, 1),
+                "height": round(cell_height * 0.5, 1),
+                "confidence": 0.9,
+                "class": "bubble",
+                "class_id": 0,
+                "detection_id": f"standin-{row}-{column}",
+            })
+    return predictions
+
+
+def decode_upload(body, content_type):
+    """
+    Decode the page image of a detect request.
+    
+    Args:
+        body (bytes): Request body
+        content_type (str): Content-Type header
+    
+    Returns:
+        PIL.Image: Uploaded image
+    """
+    if content_type.startswith("multipart/form-data"):
+        boundary = content_type.split("boundary=", 1)[1].strip('"').encode("latin-1")
+        for part in body.split(b"--" + boundary):
+            headers, _, data = part.partition(b"\r\n\r\n")
+            if b'name="file"' in headers:
+                return Image.open(BytesIO(data[:-2] if data.endswith(b"\r\n") else data))
+        raise ValueError("No file part in multipart upload")
+    return Image.open(BytesIO(base64.b64decode(body)))
+
+
+class RoboflowStandIn(ThreadingHTTPServer):
+    """
+    Local HTTP/1.1 server mimicking the Roboflow detect API.
+    
+    Usage:
+        server = RoboflowStandIn().start()
+        reader = Manga_Reader(backend_options={'detector': {'api_base': server.url, 'api_key': 'offline'}})
+        ...
+        server.shutdown()
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, host="127.0.0.1", port=0, predict=grid_predictions, latency=0.0):
+        """
+        Args:
+            host (str): Interface to listen on
+            port (int): Port (0 = any free port)
+            predict (callable): (width, height) of the upload -> prediction dicts
+            latency (float): Seconds added to every response, to model the API
+        """
+        super().__init__((host, port), _StandInHandler)
+        self.predict = predict
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        self._counter_lock = threading.Lock()
+    
+    @property
+    def url(self):
+        """API base URL to use as api_base / ROBOFLOW_API_BASE."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self):
+        """Serve in a daemon thread; returns the server."""
+        threading.Thread(target=self.serve_forever, name="roboflow-standin", daemon=True).start()
+        logger.info(f"Roboflow stand-in listening on {self.url}")
+        return self
+    
+    def count(self, key):
+        with self._counter_lock:
+            setattr(self, key, getattr(self, key) + 1)
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    
+    def setup(self):
+        super().setup()
+        self.server.count('connections')
+    
+    def do_POST(self):
+        start_time = time.perf_counter()
+        self.server.count('requests')
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            image = decode_upload(body, self.headers.get("Content-Type", ""))
+            status, result = 200, {
+                "predictions": self.server.predict(image.size),
+                "image": {"width": image.width, "height": image.height},
+            }
+        except Exception as e:
+            status, result = 400, {"message": f"Invalid upload: {e}"}
+        
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        result["time"] = round(time.perf_counter() - start_time, 4)
+        payload = json.dumps(result).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureOcr:
+    """
+    Deterministic OCR: the same crop always gives the same text.
+    
+    Crops listed in fixtures (keyed by crop_key) return their fixture text;
+    any other crop returns one of FIXTURE_TEXTS chosen by its pixels.
+    """
+    
+    def __init__(self, fixtures=None, path=None):
+        """
+        Args:
+            fixtures (dict): crop_key -> text
+            path (str): JSON file with more fixtures
+        """
+        self.fixtures = dict(fixtures or {})
+        if path:
+            with open(path, encoding="utf-8") as f:
+                self.fixtures.update(json.load(f))
+    
+    @staticmethod
+    def crop_key(crop):
+        """CRC32 of the crop pixels, as 8 hex digits."""
+        pixels = np.ascontiguousarray(np.asarray(crop))
+        return f"{zlib.crc32(pixels.tobytes()) & 0xffffffff:08x}"
+    
+    def __call__(self, crop):
+        key = self.crop_key(crop)
+        return self.fixtures.get(key) or FIXTURE_TEXTS[int(key, 16) % len(FIXTURE_TEXTS)]
+    
+    def recognize_batch(self, crops, batch_size=None):
+        """Recognize many crops (no batching needed)."""
+        return [self(crop) for crop in crops]
+
+
+class EchoTranslator:
+    """Translator returning the text unchanged."""
+    
+    def __init__(self, target_language, source=None):
+        self.source = source
+        self.target = target_language
+    
+    def translate(self, text):
+        return text
+
+
+class DictionaryTranslator:
+    """
+    Translator looking every line up in a dictionary.
+    
+    Lines without an entry are returned unchanged, so batched requests
+    (lines joined with newlines) keep their line count.
+    """
+    
+    def __init__(self, target_language, entries=None, path=None, source=None):
+        """
+        Args:
+            target_language (str): Target language code
+            entries (dict): source text -> translation (default: FIXTURE_DICTIONARY)
+            path (str): JSON file, either {source: translation} or
+                {language: {source: translation}}
+            source (str): Source language code (informational)
+        """
+        self.source = source
+        self.target = target_language
+        if path:
+            with open(path, encoding="utf-8") as f:
+                entries = json.load(f)
+        elif entries is None:
+            entries = FIXTURE_DICTIONARY
+        if entries and all(isinstance(value, dict) for value in entries.values()):
+            entries = entries.get(target_language, {})
+        self.entries = entries
+    
+    def translate(self, text):
+        return "\n".join(self.entries.get(line.strip(), line) for line in text.split("\n"))
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Serve a local stand-in of the Roboflow detect API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    server = RoboflowStandIn(args.host, args.port, latency=args.latency)
+    print(f"Roboflow stand-in on {server.url} (set ROBOFLOW_API_BASE={server.url} ROBOFLOW_API_KEY=offline)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,125 @@
+"""
+Tiled detection for very tall pages (long-strip webtoons).
+
+A 800x20000 strip sent as one image is either shrunk by the detector until
+bubbles are a few pixels tall, or makes for a huge request. Tall pages are
+cut instead into overlapping tiles about as tall as they are wide, every
+tile is detected on its own, and the boxes are merged back into page
+coordinates. Only the tiles being detected are held as separate images.
+"""
+
+import logging
+import math
+import numpy as np
+
+from boxes import nms, NMS_IOU_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+# Pages taller than TILE_MIN_ASPECT x their width are detected in tiles
+TILE_MIN_ASPECT = 2.5
+
+# Tile height and overlap between consecutive tiles, as multiples of the
+# page width. A bubble shorter than the overlap (less TILE_OVERLAP_SLACK) is
+# seen whole by some tile.
+TILE_ASPECT = 1.5
+TILE_OVERLAP = 0.5
+
+# The overlap may shrink by up to this much (x page width) when that saves
+# a whole tile, e.g. a page just a few pixels taller than two tiles
+TILE_OVERLAP_SLACK = 0.05
+
+# Tiles detected concurrently (Roboflow requests in flight)
+TILE_WORKERS = 4
+
+# A box this close to an inner tile edge (pixels) is cut by the tile
+TILE_EDGE_MARGIN = 2
+
+
+def should_tile(size, min_aspect=TILE_MIN_ASPECT):
+    """
+    Return True if a page is tall enough to be detected in tiles.
+    
+    Args:
+        size (tuple): Page (width, height)
+        min_aspect (float): Height/width ratio from which pages are tiled
+    """
+    width, height = size
+    return width > 0 and height > width * min_aspect
+
+
+def tile_spans(size, aspect=TILE_ASPECT, overlap=TILE_OVERLAP, slack=TILE_OVERLAP_SLACK):
+    """
+    Split a page into overlapping full-width tiles.
+    
+    The fewest tiles whose overlaps are at least overlap - slack are spread
+    evenly over the page, so every overlap is about the same (usually a
+    bit larger than overlap) instead of the last tile nearly repeating the
+    one before it.
+    
+    Args:
+        size (tuple): Page (width, height)
+        aspect (float): Tile height as a multiple of the page width
+        overlap (float): Overlap between tiles as a multiple of the page width
+        slack (float): How much the overlap may shrink to save a tile
+    
+    Returns:
+        list: (top, bottom) pixel rows of every tile, top to bottom. The
+            first tile starts at the top of the page, the last one ends at
+            its bottom.
+    """
+    width, height = size
+    tile_height = min(height, max(1, int(width * aspect)))
+    max_step = max(1, tile_height - int(width * (overlap - slack)))
+    count = math.ceil((height - tile_height) / max_step) + 1
+    if count == 1:
+        return [(0, height)]
+    
+    stride = (height - tile_height) / (count - 1)
+    return [(round(i * stride), round(i * stride) + tile_height) for i in range(count)]
+
+
+def merge_tile_boxes(spans, tile_boxes, iou_threshold=NMS_IOU_THRESHOLD):
+    """
+    Merge boxes detected in tiles back into page coordinates.
+    
+    A box cut by the bottom edge of its tile is dropped when it starts
+    inside the next tile, which sees that bubble whole (and likewise for
+    boxes cut by the top edge). Remaining duplicates from the overlaps are
+    removed with NMS.
+    
+    Args:
+        spans (list): (top, bottom) of every tile, from tile_spans
+        tile_boxes (list): One list of [x1, y1, x2, y2] boxes per tile, in
+            tile coordinates
+        iou_threshold (float): NMS overlap threshold
+    
+    Returns:
+        list: [x1, y1, x2, y2] boxes in page coordinates, top to bottom
+    """
+    counts = [len(boxes) for boxes in tile_boxes]
+    if sum(counts) == 0:
+        return []
+    
+    boxes = np.concatenate([np.asarray(b, dtype=np.float64).reshape(-1, 4) for b in tile_boxes])
+    tile = np.repeat(np.arange(len(spans)), counts)
+    tops = np.array([top for top, _ in spans], dtype=np.float64)
+    bottoms = np.array([bottom for _, bottom in spans], dtype=np.float64)
+    
+    # Tile to page coordinates
+    boxes[:, [1, 3]] += tops[tile, None]
+    
+    last = len(spans) - 1
+    next_top = np.append(tops[1:], np.inf)[tile]
+    previous_bottom = np.insert(bottoms[:-1], 0, -np.inf)[tile]
+    cut_bottom = (tile < last) & (boxes[:, 3] >= bottoms[tile] - TILE_EDGE_MARGIN)
+    cut_top = (tile > 0) & (boxes[:, 1] <= tops[tile] + TILE_EDGE_MARGIN)
+    seen_whole_elsewhere = (cut_bottom & (boxes[:, 1] >= next_top)) | (cut_top & (boxes[:, 3] <= previous_bottom))
+    boxes = boxes[~seen_whole_elsewhere]
+    
+    keep = nms(boxes, iou_threshold=iou_threshold)
+    merged = boxes[keep]
+    merged = merged[np.argsort(merged[:, 1], kind='stable')]
+    
+    logger.info(f"Merged {sum(counts)} tile boxes into {len(merged)} textboxes")
+    return merged.astype(int).tolist()